@@ -0,0 +1,78 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from argparse import ArgumentParser
+
+from benchmarks.benchmark import DEFAULT_SCALES, DEFAULT_SEED, DEFAULT_STARTUP_REPEATS, DEFAULT_TIME_CAP, \
+    run_benchmarks, run_startup_benchmarks, save_results, format_result, format_startup_result
+from common.registry import discover_days
+from common.runner import PARTS, SELECTOR_ALL, parse_selector
+
+"""
+Benchmarks runner; python -m benchmarks --help
+"""
+
+################################################################################
+
+def create_parser() -> ArgumentParser:
+    """
+    :return: command line parser; days, parts and input sizes to benchmark
+    """
+
+    parser = ArgumentParser(prog="python -m benchmarks",
+                            description="Advent Of Code 2021 puzzles benchmarks")
+    parser.add_argument(
+        "-d", "--day", nargs="+", default=[SELECTOR_ALL],
+        help="days to benchmark, e.g. \"1 3 11\" or \"1,3,11\" (default: %s)" % SELECTOR_ALL)
+    parser.add_argument(
+        "-p", "--part", nargs="+", default=[SELECTOR_ALL],
+        help="puzzles of each day to benchmark, 1 and/or 2 (default: %s)" % SELECTOR_ALL)
+    parser.add_argument(
+        "-s", "--scale", nargs="+", type=int, default=list(DEFAULT_SCALES),
+        help="input sizes relative to the real inputs (default: %s)"
+             % " ".join(str(scale) for scale in DEFAULT_SCALES))
+    parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED,
+        help="seed of the generated inputs (default: %d)" % DEFAULT_SEED)
+    parser.add_argument(
+        "--no-memory", action="store_true",
+        help="do not measure the peak memory (halves the benchmark time)")
+    parser.add_argument(
+        "--time-cap", type=float, default=DEFAULT_TIME_CAP,
+        help="seconds a puzzle may take at one scale, bigger scales expected to take longer are skipped; "
+             "0 for no cap (default: %g)" % DEFAULT_TIME_CAP)
+    parser.add_argument(
+        "--startup", action="store_true",
+        help="measure the startup time of single puzzle runs of main.py as well (best of %d)"
+             % DEFAULT_STARTUP_REPEATS)
+    parser.add_argument(
+        "-o", "--output",
+        help="results JSON file (default: benchmarks/results/<date>_<time>.json)")
+    return parser
+
+################################################################################
+
+if __name__ == "__main__":
+    parser = create_parser()
+    arguments = parser.parse_args()
+    try:
+        days = parse_selector(arguments.day, discover_days())
+        parts = parse_selector(arguments.part, PARTS)
+    except ValueError as error:
+        parser.error(str(error))
+
+    results = []
+    for result in run_benchmarks(days, parts, tuple(arguments.scale), arguments.seed,
+                                 not arguments.no_memory, arguments.time_cap if arguments.time_cap > 0 else None):
+        print(format_result(result))
+        results.append(result)
+    startup = None
+    if arguments.startup:
+        startup = []
+        for result in run_startup_benchmarks(days, parts):
+            print(format_startup_result(result))
+            startup.append(result)
+    print("results saved to %s" % save_results(results, arguments.seed, arguments.output, startup))
+    exit(0)
+
+################################################################################
@@ -0,0 +1,313 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from datetime import datetime
+from json import dump
+from os import makedirs
+from os.path import abspath, dirname, getsize, join
+from platform import platform, python_version
+from random import Random
+from subprocess import run
+from sys import executable
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from tracemalloc import start as start_tracing, stop as stop_tracing, get_traced_memory
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+from benchmarks.generators import GENERATORS, UNSOLVABLE
+from common.input_loader import binary_cache_bypassed, clear_cache
+from common.registry import load_day
+from common.runner import KEY_DAY, KEY_PART, KEY_ANSWER, KEY_PARSE_TIME, KEY_SOLVE_TIME
+
+"""
+Benchmarks of all the days on synthetic inputs of configurable sizes. Parsing
+and solving are timed separately and the peak memory of both is recorded; the
+text is always parsed, the parse from the binary cache of the parsed input is
+timed on its own. The results are saved as JSON, so the runs can be compared
+over time. The startup time of single puzzle runs (a new interpreter running
+main.py) can be measured as well.
+"""
+
+################################################################################
+
+DEFAULT_SCALES = (10, 100, 1000)
+DEFAULT_SEED = 2021
+# seconds a puzzle may take (parse and solve) at one scale; bigger scales
+# expected to take longer are skipped
+DEFAULT_TIME_CAP = 60.0
+RESULTS_DIR_NAME = "results"
+KEY_SCALE = "SCALE"
+KEY_INPUT_SIZE = "INPUT_SIZE"
+KEY_CACHED_PARSE_TIME = "CACHED_PARSE_TIME"
+KEY_PEAK_MEMORY = "PEAK_MEMORY"
+KEY_SKIPPED = "SKIPPED"
+KEY_ESTIMATED_TIME = "ESTIMATED_TIME"
+KEY_TIMESTAMP = "TIMESTAMP"
+KEY_PYTHON = "PYTHON"
+KEY_PLATFORM = "PLATFORM"
+KEY_SEED = "SEED"
+KEY_RESULTS = "RESULTS"
+DEFAULT_STARTUP_REPEATS = 5
+MAIN_SCRIPT_NAME = "main.py"
+KEY_WALL_TIME = "WALL_TIME"
+KEY_RUN_TIME = "RUN_TIME"
+KEY_STARTUP_TIME = "STARTUP_TIME"
+KEY_INTERPRETER_TIME = "INTERPRETER_TIME"
+KEY_STARTUP = "STARTUP"
+
+################################################################################
+
+def generate_input(day: int, scale: int, seed: int, dir_path: str) -> str:
+    """
+    :param day: day number
+    :param scale: how many times bigger than the real input
+    :param seed: random numbers generator seed, the same seed creates the same
+    input
+    :param dir_path: directory to create the input file in
+    :return: path of the generated input file
+    """
+
+    path = join(dir_path, "day_%02d_x%d.txt" % (day, scale))
+    with open(path, "w") as f:
+        f.write(GENERATORS[day](scale, Random("%d-%d-%d" % (seed, day, scale))))
+
+    return path
+
+################################################################################
+
+def benchmark_puzzle(day: int, part: int, path: str, trace_memory: bool = True) -> Dict[str, Union[int, float, None]]:
+    """
+    Solves the puzzle on the input file. The parse and solve times are measured
+    without memory tracing; if it is enabled, the puzzle is run once more with
+    tracing on, to get its peak memory. The binary cache of the parsed input is
+    bypassed, so every part of every run parses the text; the parse from the
+    binary cache (written by an extra parse first) is timed separately.
+
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :param path: input file path
+    :param trace_memory: whether to measure the peak memory as well
+    :return: the answer, parse time, parse time from the binary cache (the same
+    as the parse time for the days without it) and solve time (in seconds) and
+    peak memory (in bytes, None if not measured)
+    """
+
+    module = load_day(day)
+    solve = getattr(module, "solve_%d" % part)
+
+    with binary_cache_bypassed():
+        clear_cache()
+        start = perf_counter()
+        data = module.parse_input(path)
+        parse_time = perf_counter() - start
+
+        start = perf_counter()
+        answer = solve(data)
+        solve_time = perf_counter() - start
+
+        peak_memory = None
+        if trace_memory:
+            del data
+            clear_cache()
+            start_tracing()
+            try:
+                solve(module.parse_input(path))
+                peak_memory = get_traced_memory()[1]
+            finally:
+                stop_tracing()
+        clear_cache()
+
+    # the first parse writes the binary cache, the second one reads it
+    module.parse_input(path)
+    clear_cache()
+    start = perf_counter()
+    module.parse_input(path)
+    cached_parse_time = perf_counter() - start
+    clear_cache()
+
+    return {
+        KEY_DAY: day,
+        KEY_PART: part,
+        KEY_ANSWER: answer,
+        KEY_PARSE_TIME: parse_time,
+        KEY_CACHED_PARSE_TIME: cached_parse_time,
+        KEY_SOLVE_TIME: solve_time,
+        KEY_PEAK_MEMORY: peak_memory
+    }
+
+################################################################################
+
+def run_benchmarks(days: Tuple[int, ...], parts: Tuple[int, ...], scales: Tuple[int, ...],
+                   seed: int = DEFAULT_SEED, trace_memory: bool = True,
+                   time_cap: float = DEFAULT_TIME_CAP) -> Iterator[Dict[str, Any]]:
+    """
+    Generates the inputs and benchmarks the puzzles on them, the results are
+    yielded as soon as they are measured. Once a puzzle was measured, it is
+    skipped at the scales it is expected to take longer than the time cap at
+    (its time is supposed to grow linearly with the input size), so the slow
+    puzzles do not hold the whole run up for hours.
+
+    :param days: selected days
+    :param parts: selected puzzles of each day
+    :param scales: sizes of the generated inputs, relative to the real inputs
+    :param seed: random numbers generator seed
+    :param trace_memory: whether to measure the peak memory as well
+    :param time_cap: seconds a puzzle may take at one scale; None for no cap
+    :return: results of the benchmarks, ordered by day, scale and part
+    """
+
+    # (day, part): the last measured scale and its time
+    measured = {}
+    with TemporaryDirectory() as dir_path:
+        for day in days:
+            for scale in scales:
+                path = generate_input(day, scale, seed, dir_path)
+                for part in parts:
+                    estimated_time = 0.0
+                    if (day, part) in measured:
+                        measured_scale, seconds = measured[(day, part)]
+                        estimated_time = seconds * scale / measured_scale
+                    if (day, part) in UNSOLVABLE:
+                        result = {KEY_DAY: day, KEY_PART: part, KEY_SKIPPED: True}
+                    elif time_cap is not None and estimated_time > time_cap:
+                        result = {KEY_DAY: day, KEY_PART: part, KEY_SKIPPED: True,
+                                  KEY_ESTIMATED_TIME: estimated_time}
+                    else:
+                        result = benchmark_puzzle(day, part, path, trace_memory)
+                        measured[(day, part)] = (scale, result[KEY_PARSE_TIME] + result[KEY_SOLVE_TIME])
+                    result[KEY_SCALE] = scale
+                    result[KEY_INPUT_SIZE] = getsize(path)
+                    yield result
+
+################################################################################
+
+def _run_python(arguments: List[str]) -> Tuple[float, str]:
+    """
+    :param arguments: command line arguments of a new interpreter process, run
+    in the root directory of the project
+    :return: wall time of the process (in seconds) and its output
+    """
+
+    start = perf_counter()
+    process = run([executable] + arguments, cwd=dirname(dirname(abspath(__file__))),
+                  capture_output=True, text=True, check=True)
+    return perf_counter() - start, process.stdout
+
+################################################################################
+
+def benchmark_startup(day: int, part: int, repeats: int = DEFAULT_STARTUP_REPEATS) -> Dict[str, Union[int, float]]:
+    """
+    Runs the puzzle on the real input by main.py in a new interpreter, the same
+    way as from the command line. The startup time is the wall time of the
+    process without the time of the puzzles run (as reported by main.py); the
+    time of a bare interpreter is measured for reference too. The best of the
+    repeats is taken of each.
+
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :param repeats: number of runs
+    :return: wall, run, startup and bare interpreter times (in seconds)
+    """
+
+    wall_time = run_time = startup_time = interpreter_time = float("inf")
+    for _ in range(repeats):
+        time, output = _run_python([MAIN_SCRIPT_NAME, "-d", str(day), "-p", str(part)])
+        # the last line of the output is "total <time> ms"
+        reported = float(output.split()[-2]) / 1000
+        wall_time = min(wall_time, time)
+        run_time = min(run_time, reported)
+        startup_time = min(startup_time, time - reported)
+        interpreter_time = min(interpreter_time, _run_python(["-c", "pass"])[0])
+
+    return {
+        KEY_DAY: day,
+        KEY_PART: part,
+        KEY_WALL_TIME: wall_time,
+        KEY_RUN_TIME: run_time,
+        KEY_STARTUP_TIME: startup_time,
+        KEY_INTERPRETER_TIME: interpreter_time
+    }
+
+################################################################################
+
+def run_startup_benchmarks(days: Tuple[int, ...], parts: Tuple[int, ...],
+                           repeats: int = DEFAULT_STARTUP_REPEATS) -> Iterator[Dict[str, Union[int, float]]]:
+    """
+    :param days: selected days
+    :param parts: selected puzzles of each day
+    :param repeats: number of runs of each puzzle
+    :return: startup benchmarks results, ordered by day and part
+    """
+
+    for day in days:
+        for part in parts:
+            yield benchmark_startup(day, part, repeats)
+
+################################################################################
+
+def save_results(results: List[Dict[str, Any]], seed: int, path: str = None,
+                 startup: List[Dict[str, Any]] = None) -> str:
+    """
+    :param results: results of the benchmarks
+    :param seed: random numbers generator seed the inputs were generated with
+    :param path: JSON file path; by default a new file named by the current time
+    in the results directory next to this module
+    :param startup: results of the startup benchmarks, if they were run
+    :return: path of the saved file
+    """
+
+    timestamp = datetime.now()
+    if path is None:
+        path = join(dirname(__file__), RESULTS_DIR_NAME, timestamp.strftime("%Y%m%d_%H%M%S.json"))
+    if len(dirname(path)) > 0:
+        makedirs(dirname(path), exist_ok=True)
+
+    summary = {
+        KEY_TIMESTAMP: timestamp.isoformat(timespec="seconds"),
+        KEY_PYTHON: python_version(),
+        KEY_PLATFORM: platform(),
+        KEY_SEED: seed,
+        KEY_RESULTS: results
+    }
+    if startup is not None:
+        summary[KEY_STARTUP] = startup
+    with open(path, "w") as f:
+        dump(summary, f, indent=4)
+
+    return path
+
+################################################################################
+
+def format_result(result: Dict[str, Any]) -> str:
+    """
+    :param result: result of one benchmark
+    :return: one line of the results table
+    """
+
+    line = "day %02d, part %d, x%-5d (%10d B): " % (
+        result[KEY_DAY], result[KEY_PART], result[KEY_SCALE], result[KEY_INPUT_SIZE])
+    if result.get(KEY_SKIPPED, False):
+        if KEY_ESTIMATED_TIME in result:
+            return line + "skipped, expected to take %.3f s" % result[KEY_ESTIMATED_TIME]
+        return line + "skipped"
+
+    line += "%16s | parse %12.3f ms (cached %12.3f ms) | solve %12.3f ms" % (
+        result[KEY_ANSWER], result[KEY_PARSE_TIME] * 1000, result[KEY_CACHED_PARSE_TIME] * 1000,
+        result[KEY_SOLVE_TIME] * 1000)
+    if result[KEY_PEAK_MEMORY] is not None:
+        line += " | peak %10.1f KiB" % (result[KEY_PEAK_MEMORY] / 1024)
+    return line
+
+################################################################################
+
+def format_startup_result(result: Dict[str, Union[int, float]]) -> str:
+    """
+    :param result: result of one startup benchmark
+    :return: one line of the startup results table
+    """
+
+    return "day %02d, part %d, startup: %9.3f ms | run %9.3f ms | wall %9.3f ms | interpreter %9.3f ms" % (
+        result[KEY_DAY], result[KEY_PART], result[KEY_STARTUP_TIME] * 1000, result[KEY_RUN_TIME] * 1000,
+        result[KEY_WALL_TIME] * 1000, result[KEY_INTERPRETER_TIME] * 1000)
+
+################################################################################
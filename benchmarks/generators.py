@@ -0,0 +1,296 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from math import isqrt
+from random import Random
+from typing import Callable, Dict, Tuple
+
+"""
+Synthetic puzzle inputs for the benchmarks. Each generator creates an input in
+the same format as the real one of its day, roughly scale-times bigger.
+"""
+
+################################################################################
+
+# sizes of the real inputs
+DEPTHS_COUNT = 2000
+COMMANDS_COUNT = 1000
+DIAGNOSTIC_NUMBERS_COUNT = 1000
+DIAGNOSTIC_NUMBER_WIDTH = 12
+BINGO_BOARDS_COUNT = 100
+BINGO_NUMBERS_COUNT = 100
+BINGO_BOARD_LENGTH = 5
+VENT_LINES_COUNT = 500
+VENT_DIAGRAM_SIZE = 1000
+CRABS_COUNT = 1000
+CRABS_MAX_POSITION = 2000
+DISPLAY_ENTRIES_COUNT = 200
+HEIGHTMAP_ROWS_COUNT = 100
+HEIGHTMAP_COLUMNS_COUNT = 100
+NAVIGATION_LINES_COUNT = 110
+NAVIGATION_CHUNKS_DEPTH = 6
+OCTOPUSES_GRID_SIZE = 10
+
+SEGMENTS = "abcdefg"
+DIGITS_SEGMENTS = ("abcefg", "cf", "acdeg", "acdfg", "bcdf",
+                   "abdfg", "abdefg", "acf", "abcdefg", "abcdfg")
+CHARACTERS_PAIRS = {
+    "(": ")",
+    "[": "]",
+    "{": "}",
+    "<": ">",
+}
+
+################################################################################
+
+def generate_day_01(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: sonar sweep report; a random walk of depths
+    """
+
+    depths = []
+    depth = rnd.randrange(100, 200)
+    for _ in range(DEPTHS_COUNT * scale):
+        depth = max(0, depth + rnd.randint(-10, 20))
+        depths.append(str(depth))
+
+    return "\n".join(depths) + "\n"
+
+################################################################################
+
+def generate_day_02(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: planned course; down commands are more likely than up commands, so
+    the submarine does not surface
+    """
+
+    commands = rnd.choices(("forward", "down", "up"), weights=(5, 3, 2), k=COMMANDS_COUNT * scale)
+    return "".join("%s %d\n" % (command, rnd.randint(1, 9)) for command in commands)
+
+################################################################################
+
+def generate_day_03(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: diagnostic report; unique binary numbers of the same width (the
+    width grows with the count, so the numbers can stay unique)
+    """
+
+    count = DIAGNOSTIC_NUMBERS_COUNT * scale
+    width = max(DIAGNOSTIC_NUMBER_WIDTH, count.bit_length() + 2)
+    return "".join(format(number, "0%db" % width) + "\n"
+                   for number in rnd.sample(range(2 ** width), count))
+
+################################################################################
+
+def generate_day_04(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: drawn numbers and bingo boards; all the numbers are drawn, so every
+    board wins eventually
+    """
+
+    numbers = list(range(BINGO_NUMBERS_COUNT))
+    rnd.shuffle(numbers)
+    lines = [",".join(str(number) for number in numbers)]
+
+    for _ in range(BINGO_BOARDS_COUNT * scale):
+        board = rnd.sample(range(BINGO_NUMBERS_COUNT), BINGO_BOARD_LENGTH ** 2)
+        lines.append("")
+        for row in range(BINGO_BOARD_LENGTH):
+            lines.append(" ".join("%2d" % number for number in
+                                  board[row * BINGO_BOARD_LENGTH:(row + 1) * BINGO_BOARD_LENGTH]))
+
+    return "\n".join(lines) + "\n"
+
+################################################################################
+
+def _vent_line_span(rnd: Random, length: int) -> Tuple[int, int]:
+    """
+    :param rnd: random numbers generator
+    :param length: distance between the coordinates
+    :return: start and end coordinate of a line, in any direction
+    """
+
+    start = rnd.randrange(VENT_DIAGRAM_SIZE - length)
+    if rnd.random() < 0.5:
+        return start, start + length
+    else:
+        return start + length, start
+
+################################################################################
+
+def generate_day_05(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: lines of vents; horizontal, vertical and diagonal (45 degrees) ones
+    in the diagram of the real input size
+    """
+
+    lines = []
+    for _ in range(VENT_LINES_COUNT * scale):
+        length = rnd.randrange(1, VENT_DIAGRAM_SIZE)
+        xs = _vent_line_span(rnd, length)
+        ys = _vent_line_span(rnd, length)
+        kind = rnd.randrange(3)
+        if kind == 0:
+            # horizontal
+            ys = (ys[0], ys[0])
+        elif kind == 1:
+            # vertical
+            xs = (xs[0], xs[0])
+        lines.append("%d,%d -> %d,%d" % (xs[0], ys[0], xs[1], ys[1]))
+
+    return "\n".join(lines) + "\n"
+
+################################################################################
+
+def generate_day_07(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: horizontal positions of the crabs, in the range of the real input
+    """
+
+    return ",".join(str(rnd.randrange(CRABS_MAX_POSITION))
+                    for _ in range(CRABS_COUNT * scale)) + "\n"
+
+################################################################################
+
+def _scramble_display(rnd: Random) -> Tuple[str, ...]:
+    """
+    :param rnd: random numbers generator
+    :return: signal patterns of all ten digits for randomly wired segments
+    """
+
+    wires = list(SEGMENTS)
+    rnd.shuffle(wires)
+    wiring = dict(zip(SEGMENTS, wires))
+    patterns = []
+    for digit_segments in DIGITS_SEGMENTS:
+        pattern = [wiring[segment] for segment in digit_segments]
+        rnd.shuffle(pattern)
+        patterns.append("".join(pattern))
+
+    return tuple(patterns)
+
+################################################################################
+
+def generate_day_08(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: entries; ten unique signal patterns and four digit output values,
+    each entry wired randomly
+    """
+
+    entries = []
+    for _ in range(DISPLAY_ENTRIES_COUNT * scale):
+        patterns = _scramble_display(rnd)
+        unique_patterns = list(patterns)
+        rnd.shuffle(unique_patterns)
+        output_values = [patterns[rnd.randrange(10)] for _ in range(4)]
+        entries.append("%s | %s" % (" ".join(unique_patterns), " ".join(output_values)))
+
+    return "\n".join(entries) + "\n"
+
+################################################################################
+
+def generate_day_09(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: heightmap; the real input width, scale-times more rows
+    """
+
+    return "".join("".join(str(rnd.randrange(10)) for _ in range(HEIGHTMAP_COLUMNS_COUNT)) + "\n"
+                   for _ in range(HEIGHTMAP_ROWS_COUNT * scale))
+
+################################################################################
+
+def _navigation_chunks(rnd: Random, depth: int) -> str:
+    """
+    :param rnd: random numbers generator
+    :param depth: maximum nesting of the chunks
+    :return: legal sequence of chunks
+    """
+
+    chunks = ""
+    for _ in range(rnd.randint(1, 3)):
+        opening = rnd.choice(tuple(CHARACTERS_PAIRS.keys()))
+        inner = _navigation_chunks(rnd, depth - 1) if depth > 0 and rnd.random() < 0.7 else ""
+        chunks += opening + inner + CHARACTERS_PAIRS[opening]
+
+    return chunks
+
+################################################################################
+
+def generate_day_10(scale: int, rnd: Random) -> str:
+    """
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: navigation subsystem; about half of the lines is corrupted, the
+    other half is incomplete
+    """
+
+    lines = []
+    for _ in range(NAVIGATION_LINES_COUNT * scale):
+        line = _navigation_chunks(rnd, NAVIGATION_CHUNKS_DEPTH)
+        closing = [i for i in range(len(line)) if line[i] not in CHARACTERS_PAIRS.keys()]
+        if rnd.random() < 0.5:
+            # corrupted; one of the closing characters is wrong
+            i = rnd.choice(closing)
+            wrong = rnd.choice(tuple(char for char in CHARACTERS_PAIRS.values() if char != line[i]))
+            line = line[:i] + wrong + line[i + 1:]
+        else:
+            # incomplete; cut right before one of the closing characters
+            line = line[:rnd.choice(closing)]
+            if len(line) == 0:
+                line = rnd.choice(tuple(CHARACTERS_PAIRS.keys()))
+        lines.append(line)
+
+    return "\n".join(lines) + "\n"
+
+################################################################################
+
+def generate_day_11(scale: int, rnd: Random) -> str:
+    """
+    The octopuses of a random grid practically never flash all at once, so the
+    generated input is good for the first puzzle only.
+
+    :param scale: how many times bigger than the real input
+    :param rnd: random numbers generator
+    :return: energy levels of a square grid of octopuses, scale-times more of
+    them than in the real input
+    """
+
+    size = isqrt(OCTOPUSES_GRID_SIZE ** 2 * scale)
+    return "".join("".join(str(rnd.randrange(10)) for _ in range(size)) + "\n"
+                   for _ in range(size))
+
+################################################################################
+
+GENERATORS: Dict[int, Callable[[int, Random], str]] = {
+    1: generate_day_01,
+    2: generate_day_02,
+    3: generate_day_03,
+    4: generate_day_04,
+    5: generate_day_05,
+    7: generate_day_07,
+    8: generate_day_08,
+    9: generate_day_09,
+    10: generate_day_10,
+    11: generate_day_11
+}
+
+# puzzles that cannot be solved on generated inputs
+UNSOLVABLE = ((11, 2),)
+
+################################################################################
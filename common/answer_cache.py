@@ -0,0 +1,147 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from collections import OrderedDict
+from hashlib import sha256
+from json import dump, load
+from os import getpid, replace
+from typing import Tuple, Union
+
+from common.input_loader import input_digest
+
+"""
+Memoization of the puzzle answers. An answer is stored under the day, the part,
+the SHA-256 digest of the input and the version of the solver (the digest of
+the day module source), so it is found again only for an unchanged input solved
+by an unchanged solver. The least recently used answers are evicted once the
+cache is full; the cache can be backed by a JSON file, so the answers survive
+between runs.
+"""
+
+################################################################################
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_ANSWER_CACHE_PATH = ".answer_cache.json"
+
+################################################################################
+
+def solver_version(module_path: str) -> str:
+    """
+    :param module_path: path of the day module source file
+    :return: version of the solver; the SHA-256 digest of its source, so any
+    change of the module invalidates its answers
+    """
+
+    with open(module_path, "rb") as f:
+        return sha256(f.read()).hexdigest()
+
+################################################################################
+
+def answer_key(day: int, part: int, input_path: str, module_path: str) -> Tuple[int, int, str, str]:
+    """
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :param input_path: input file path
+    :param module_path: path of the day module source file
+    :return: key of the answer in the cache
+    """
+
+    return day, part, input_digest(input_path).hex(), solver_version(module_path)
+
+################################################################################
+
+class AnswerCache(object):
+
+################################################################################
+
+    def __init__(self, path: str = None, capacity: int = DEFAULT_CAPACITY):
+        """
+        :param path: JSON file backing the cache, loaded right away if it
+        exists; the cache is kept in memory only by default
+        :param capacity: maximum number of answers, the least recently used ones
+        are evicted beyond it
+        """
+
+        super().__init__()
+
+        self._path = path
+        self._capacity = capacity
+        self._answers = OrderedDict()
+        self._modified = False
+        if path is not None:
+            self._load()
+
+################################################################################
+
+    def __len__(self) -> int:
+        """
+        :return: number of cached answers
+        """
+
+        return len(self._answers)
+
+################################################################################
+
+    def _load(self) -> None:
+        """
+        Loads the answers from the backing file; a missing or broken file is
+        the same as an empty one.
+        """
+
+        try:
+            with open(self._path) as f:
+                entries = load(f)
+        except (OSError, ValueError):
+            return
+
+        # entries are stored from the least to the most recently used one
+        for entry in entries:
+            self._answers[tuple(entry[:-1])] = entry[-1]
+        while len(self._answers) > self._capacity:
+            self._answers.popitem(last=False)
+
+################################################################################
+
+    def get(self, key: Tuple[int, int, str, str]) -> Union[int, None]:
+        """
+        :param key: answer key (see answer_key)
+        :return: the cached answer, None if there is none
+        """
+
+        answer = self._answers.get(key)
+        if answer is not None:
+            self._answers.move_to_end(key)
+        return answer
+
+################################################################################
+
+    def put(self, key: Tuple[int, int, str, str], answer: int) -> None:
+        """
+        :param key: answer key (see answer_key)
+        :param answer: puzzle answer
+        """
+
+        self._answers[key] = answer
+        self._answers.move_to_end(key)
+        while len(self._answers) > self._capacity:
+            self._answers.popitem(last=False)
+        self._modified = True
+
+################################################################################
+
+    def save(self) -> None:
+        """
+        Writes the answers to the backing file (if there is one and any answer
+        was added). The file is replaced atomically.
+        """
+
+        if self._path is None or not self._modified:
+            return
+
+        temporary_path = "%s.%d.tmp" % (self._path, getpid())
+        with open(temporary_path, "w") as f:
+            dump([list(key) + [answer] for key, answer in self._answers.items()], f)
+        replace(temporary_path, self._path)
+        self._modified = False
+
+################################################################################
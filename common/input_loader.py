@@ -0,0 +1,423 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from array import array
+from contextlib import contextmanager
+from functools import wraps
+from hashlib import sha256
+from mmap import mmap, ACCESS_READ
+from os import getcwd, getpid, replace, stat
+from os.path import abspath, basename, dirname, join
+from struct import calcsize, error as StructError, pack, unpack_from
+from sys import modules
+from typing import Any, Callable, Dict, Iterator, Tuple, Union
+
+from common.instrumentation import PHASE_PARSE, phase
+
+"""
+Common input loading for all the days. The input file is memory-mapped and
+handed back as bytes, lines or an integer array; the parsed form is cached in
+memory per path and modification time, so both puzzles of a day run in the same
+process share a single parse. Parsers can be decorated by binary_cached() to
+keep the parsed form on disk as well, so later runs do not parse the text again;
+the binary files are keyed by the input contents and by the version of the
+parser, so they are never read after either of them changes.
+"""
+
+################################################################################
+
+INPUT_TXT_NAME = "input.txt"
+INTEGER_SEPARATORS = b","
+STREAM_BLOCK_SIZE = 1 << 20
+# chunks of the parallel engines; a few per worker for balancing, and small
+# enough to be processed in memory at once
+CHUNKS_PER_WORKER = 4
+MAX_CHUNK_SIZE = 64 << 20
+BINARY_CACHE_SUFFIX = ".bin"
+BINARY_CACHE_MAGIC = b"AOC2021\0"
+BINARY_CACHE_COUNT_FORMAT = "<Q"
+BINARY_CACHE_ARRAY_FORMAT = "<c7xQ"
+BINARY_CACHE_ALIGNMENT = 8
+
+_parsed_cache: Dict[Tuple[str, Callable[[str], Any]], Tuple[Tuple[int, int], Any]] = {}
+_binary_cache_enabled = True
+
+################################################################################
+
+def input_path(dir_name: str, file_name: str = INPUT_TXT_NAME) -> str:
+    """
+    :param dir_name: day directory name, e.g. "day_01"
+    :param file_name: input file name
+    :return: path of the day input file
+    """
+
+    return join(getcwd(), dir_name, file_name)
+
+################################################################################
+
+def read_bytes(path: str) -> Union[mmap, bytes]:
+    """
+    Memory-maps the whole input file. The returned object supports the bytes
+    interface (slicing, find, split, count, ...) and is not copied into memory
+    as a whole.
+
+    :param path: input file path
+    :return: read-only memory map of the file (empty bytes for an empty file)
+    """
+
+    with open(path, "rb") as f:
+        if stat(f.fileno()).st_size == 0:
+            return b""
+        return mmap(f.fileno(), 0, access=ACCESS_READ)
+
+################################################################################
+
+@contextmanager
+def _mapped(path: str) -> Iterator[Union[mmap, bytes]]:
+    """
+    :param path: input file path
+    :return: memory map of the file, closed when leaving the context
+    """
+
+    data = read_bytes(path)
+    try:
+        yield data
+    finally:
+        if isinstance(data, mmap):
+            data.close()
+
+################################################################################
+
+def read_lines(path: str) -> Tuple[str, ...]:
+    """
+    :param path: input file path
+    :return: all the lines of the file without the surrounding whitespace
+    """
+
+    with _mapped(path) as data:
+        return tuple(line.strip() for line in data[:].decode().splitlines())
+
+################################################################################
+
+def read_ints(path: str) -> array:
+    """
+    Reads all the integers of the file; they may be separated by whitespace or
+    commas.
+
+    :param path: input file path
+    :return: all the integers in order of appearance
+    """
+
+    with _mapped(path) as data:
+        return array("q", map(int, data[:].replace(INTEGER_SEPARATORS, b" ").split()))
+
+################################################################################
+
+def iter_ints(path: str, block_size: int = STREAM_BLOCK_SIZE) -> Iterator[int]:
+    """
+    Streams all the integers of the file; they may be separated by whitespace or
+    commas. The file is read block by block, so only a single block is held in
+    memory however big the file is.
+
+    :param path: input file path
+    :param block_size: number of bytes read at once
+    :return: all the integers in order of appearance
+    """
+
+    with open(path, "rb") as f:
+        rest = b""
+        while True:
+            block = f.read(block_size)
+            if len(block) == 0:
+                break
+            data = (rest + block).replace(INTEGER_SEPARATORS, b" ")
+            # the last number of the block may continue in the next one
+            end = max(data.rfind(separator) for separator in (b" ", b"\n", b"\r", b"\t"))
+            yield from map(int, data[:end + 1].split())
+            rest = data[end + 1:]
+        yield from map(int, rest.split())
+
+################################################################################
+
+def newline_ranges(path: str, count: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    Splits the file into byte ranges of about the same size, so that it can be
+    processed in chunks (e.g. in parallel). Every range ends right after a
+    newline (the last one at the end of the file), so no line is split between
+    two ranges.
+
+    :param path: input file path
+    :param count: number of ranges wanted; there may be fewer of them if the
+    file has fewer lines
+    :return: ranges (start, end) covering the whole file, in order
+    """
+
+    ranges = []
+    with _mapped(path) as data:
+        size = len(data)
+        start = 0
+        for i in range(1, count):
+            newline = data.find(b"\n", max(start, size * i // count - 1))
+            if newline < 0:
+                break
+            if newline + 1 > start:
+                ranges.append((start, newline + 1))
+                start = newline + 1
+        if start < size:
+            ranges.append((start, size))
+
+    return tuple(ranges)
+
+################################################################################
+
+def chunk_ranges(path: str, workers: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    Splits the file into ranges of whole lines (see newline_ranges) for a pool
+    of worker processes; a few ranges per worker, so they are kept busy even if
+    some ranges take longer, and more of them if the file is big, so no range
+    is larger than MAX_CHUNK_SIZE bytes (but for a very long line).
+
+    :param path: input file path
+    :param workers: number of worker processes
+    :return: ranges (start, end) covering the whole file, in order
+    """
+
+    with open(path, "rb") as f:
+        size = stat(f.fileno()).st_size
+    return newline_ranges(path, max(workers * CHUNKS_PER_WORKER, size // MAX_CHUNK_SIZE + 1))
+
+################################################################################
+
+def read_range(path: str, start: int, end: int) -> bytes:
+    """
+    :param path: input file path
+    :param start: first byte of the range
+    :param end: byte right after the range
+    :return: the range of the file contents, read through the memory map
+    """
+
+    with _mapped(path) as data:
+        return data[start:end]
+
+################################################################################
+
+def load_parsed(path: str, parser: Callable[[str], Any]) -> Any:
+    """
+    Parses the input file with the parser, unless it was already parsed with it
+    and the file has not been modified since.
+
+    Parsed inputs are shared between the callers, they must not be modified.
+
+    :param path: input file path
+    :param parser: function turning the input file path into the parsed input
+    :return: parsed input
+    """
+
+    path = abspath(path)
+    stats = stat(path)
+    stamp = (stats.st_mtime_ns, stats.st_size)
+    key = (path, parser)
+
+    cached = _parsed_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with phase(PHASE_PARSE):
+        parsed = parser(path)
+    _parsed_cache[key] = (stamp, parsed)
+    return parsed
+
+################################################################################
+
+def input_digest(path: str) -> bytes:
+    """
+    :param path: input file path
+    :return: SHA-256 digest of the file contents
+    """
+
+    with _mapped(path) as data:
+        return sha256(data).digest()
+
+################################################################################
+
+def parser_version(parser: Callable[[str], Any]) -> bytes:
+    """
+    :param parser: parser function
+    :return: version of the parser; the SHA-256 digest of the source of its
+    module, so any change of the module (the parser, its encoder or decoder)
+    makes a new version
+    """
+
+    with open(modules[parser.__module__].__file__, "rb") as f:
+        return sha256(f.read()).digest()
+
+################################################################################
+
+def binary_cache_path(path: str, name: str) -> str:
+    """
+    :param path: input file path
+    :param name: name of the parsed form
+    :return: path of the binary cache file next to the input file
+    """
+
+    return join(dirname(path), "%s.%s%s" % (basename(path), name, BINARY_CACHE_SUFFIX))
+
+################################################################################
+
+def _write_binary(path: str, key: bytes, arrays: Tuple[array, ...]) -> None:
+    """
+    Writes the arrays to the binary cache file; a header (magic, key, arrays
+    count and the type code and length of each array) followed by the data of
+    the arrays, each of them aligned to 8 bytes. The file is replaced
+    atomically, so readers never see a partially written one.
+
+    :param path: binary cache file path
+    :param key: SHA-256 digests of the input file contents and of the parser
+    version
+    :param arrays: parsed input in the form of flat arrays
+    """
+
+    temporary_path = "%s.%d.tmp" % (path, getpid())
+    with open(temporary_path, "wb") as f:
+        f.write(BINARY_CACHE_MAGIC)
+        f.write(key)
+        f.write(pack(BINARY_CACHE_COUNT_FORMAT, len(arrays)))
+        for values in arrays:
+            f.write(pack(BINARY_CACHE_ARRAY_FORMAT, values.typecode.encode(), len(values)))
+        for values in arrays:
+            f.write(b"\0" * (-f.tell() % BINARY_CACHE_ALIGNMENT))
+            values.tofile(f)
+    replace(temporary_path, path)
+
+################################################################################
+
+def _read_binary(path: str, key: bytes) -> Union[Tuple[memoryview, ...], None]:
+    """
+    :param path: binary cache file path
+    :param key: SHA-256 digests of the input file contents and of the parser
+    version
+    :return: the arrays stored in the file as memory views of the memory-mapped
+    file (no copies are made), None if the file does not exist, was not created
+    from the same input by the same parser or is truncated
+    """
+
+    try:
+        with open(path, "rb") as f:
+            data = mmap(f.fileno(), 0, access=ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    offset = len(BINARY_CACHE_MAGIC)
+    if data[:offset] != BINARY_CACHE_MAGIC or data[offset:offset + len(key)] != key:
+        data.close()
+        return None
+    offset += len(key)
+
+    try:
+        count = unpack_from(BINARY_CACHE_COUNT_FORMAT, data, offset)[0]
+        offset += calcsize(BINARY_CACHE_COUNT_FORMAT)
+        headers = []
+        for _ in range(count):
+            headers.append(unpack_from(BINARY_CACHE_ARRAY_FORMAT, data, offset))
+            offset += calcsize(BINARY_CACHE_ARRAY_FORMAT)
+    except StructError:
+        # truncated file
+        data.close()
+        return None
+
+    bounds = []
+    for typecode, length in headers:
+        offset += -offset % BINARY_CACHE_ALIGNMENT
+        try:
+            size = length * array(typecode.decode()).itemsize
+        except (UnicodeDecodeError, ValueError):
+            # unknown type code
+            data.close()
+            return None
+        bounds.append((typecode.decode(), offset, offset + size))
+        offset += size
+    if offset > len(data):
+        # truncated file
+        data.close()
+        return None
+
+    view = memoryview(data)
+    return tuple(view[start:end].cast(typecode) for typecode, start, end in bounds)
+
+################################################################################
+
+def binary_cached(name: str,
+                  encode: Callable[[Any], Tuple[array, ...]],
+                  decode: Callable[[Tuple[memoryview, ...]], Any]) -> Callable[[Callable[[str], Any]], Callable[[str], Any]]:
+    """
+    Decorator of a parser; the parsed input is stored in a binary file next to
+    the input file, keyed by the SHA-256 digests of the input contents and of
+    the parser version (see parser_version). Next time the same input is parsed
+    by the same parser, the parsed form is loaded from the memory-mapped binary
+    file instead of tokenising the text again.
+
+    :param name: name of the parsed form, unique for the input file
+    :param encode: turns the parsed input into flat arrays; it should be
+    defined in the parser module, so it is covered by the parser version
+    :param decode: turns the flat arrays (memory views) back into the parsed
+    input; it should slice the views rather than copy them
+    :return: decorator
+    """
+
+    def decorator(parser: Callable[[str], Any]) -> Callable[[str], Any]:
+        # computed by the first call, the module is not read on import
+        version = []
+
+        @wraps(parser)
+        def wrapper(path: str) -> Any:
+            if not _binary_cache_enabled:
+                return parser(path)
+
+            if len(version) == 0:
+                version.append(parser_version(parser))
+            key = input_digest(path) + version[0]
+            cache_path = binary_cache_path(path, name)
+
+            arrays = _read_binary(cache_path, key)
+            if arrays is not None:
+                return decode(arrays)
+
+            parsed = parser(path)
+            try:
+                _write_binary(cache_path, key, encode(parsed))
+            except OSError:
+                # read-only location, just do not cache it
+                pass
+            return parsed
+
+        return wrapper
+
+    return decorator
+
+################################################################################
+
+@contextmanager
+def binary_cache_bypassed() -> Iterator[None]:
+    """
+    Within the context, the parsers decorated by binary_cached() always parse
+    the text; the binary files are neither read nor written.
+    """
+
+    global _binary_cache_enabled
+    enabled = _binary_cache_enabled
+    _binary_cache_enabled = False
+    try:
+        yield
+    finally:
+        _binary_cache_enabled = enabled
+
+################################################################################
+
+def clear_cache() -> None:
+    """
+    Forgets all the parsed inputs.
+    """
+
+    _parsed_cache.clear()
+
+################################################################################
@@ -0,0 +1,148 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from os import environ, makedirs
+from os.path import dirname
+from time import perf_counter
+from typing import Callable, ContextManager, Dict, Iterator
+
+"""
+Opt-in instrumentation of the puzzles. Time spent in the phases of a puzzle
+(parsing, the core loop, reducing the result) is recorded by the phase() context
+manager and the timed() decorator; the whole puzzle can be profiled by cProfile
+as well.
+
+Instrumentation is off unless enabled by enable() or the AOC_INSTRUMENT
+environment variable. The decorator decides at import time of the decorated
+function, so day modules imported while it is off run their original, unwrapped
+functions; the runner imports the days lazily, after the command line is parsed.
+"""
+
+################################################################################
+
+ENVIRONMENT_VARIABLE = "AOC_INSTRUMENT"
+PHASE_PARSE = "parse"
+PHASE_CORE = "core"
+PHASE_REDUCE = "reduce"
+
+_NULL_PHASE = nullcontext()
+_enabled = environ.get(ENVIRONMENT_VARIABLE, "0") not in ("", "0")
+_timings: Dict[str, float] = {}
+
+################################################################################
+
+def enable() -> None:
+    """
+    Turns the instrumentation on; for this process, the modules imported from
+    now on and the child processes started from now on.
+    """
+
+    global _enabled
+    _enabled = True
+    environ[ENVIRONMENT_VARIABLE] = "1"
+
+################################################################################
+
+def is_enabled() -> bool:
+    """
+    :return: whether the instrumentation is on
+    """
+
+    return _enabled
+
+################################################################################
+
+@contextmanager
+def _timed_phase(name: str) -> Iterator[None]:
+    """
+    :param name: phase name
+    :return: context measuring the time spent in it and adding it to the phase
+    """
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        _timings[name] = _timings.get(name, 0.0) + perf_counter() - start
+
+################################################################################
+
+def phase(name: str) -> ContextManager[None]:
+    """
+    :param name: phase name, e.g. PHASE_CORE
+    :return: context measuring the time spent in the phase; a shared do-nothing
+    context if the instrumentation is off
+    """
+
+    return _timed_phase(name) if _enabled else _NULL_PHASE
+
+################################################################################
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator adding the time spent in the function to the phase. If the
+    instrumentation is off when the function is defined, it is returned as it
+    is.
+
+    :param name: phase name, e.g. PHASE_CORE
+    :return: decorator
+    """
+
+    def decorator(function: Callable) -> Callable:
+        if not _enabled:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with _timed_phase(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+################################################################################
+
+def reset_timings() -> None:
+    """
+    Forgets all the recorded phase times.
+    """
+
+    _timings.clear()
+
+################################################################################
+
+def phase_timings() -> Dict[str, float]:
+    """
+    :return: time spent in each phase (in seconds) since the last reset
+    """
+
+    return dict(_timings)
+
+################################################################################
+
+@contextmanager
+def profiled(path: str) -> Iterator[None]:
+    """
+    Profiles the code run in the context by cProfile and dumps the stats to the
+    file; it can be read by pstats or turned into a flame graph by tools like
+    flameprof or snakeviz.
+
+    :param path: stats file path, the directory is created if needed
+    """
+
+    from cProfile import Profile
+
+    profile = Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        if len(dirname(path)) > 0:
+            makedirs(dirname(path), exist_ok=True)
+        profile.dump_stats(path)
+
+################################################################################
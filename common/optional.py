@@ -0,0 +1,55 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from importlib import import_module
+from importlib.util import find_spec
+from sys import modules
+from types import ModuleType
+from typing import Any, Union
+
+"""
+Optional dependencies. NumPy is not required; the days have vectorised
+backends that are used when it is installed, pure Python ones otherwise. It is
+imported only once a backend actually needs it, so the runner startup does not
+pay for it.
+"""
+
+################################################################################
+
+NUMPY_MODULE_NAME = "numpy"
+
+################################################################################
+
+def has_numpy() -> bool:
+    """
+    :return: whether NumPy is installed (it is not imported to find out)
+    """
+
+    return NUMPY_MODULE_NAME in modules or find_spec(NUMPY_MODULE_NAME) is not None
+
+################################################################################
+
+def numpy() -> Union[ModuleType, None]:
+    """
+    :return: NumPy module, imported now unless it already was; None if it is
+    not installed
+    """
+
+    try:
+        return import_module(NUMPY_MODULE_NAME)
+    except ImportError:
+        return None
+
+################################################################################
+
+def is_ndarray(value: Any) -> bool:
+    """
+    :param value: any value
+    :return: whether it is a NumPy array; NumPy is not imported to find out (if
+    it was not imported, the value cannot be its array)
+    """
+
+    np = modules.get(NUMPY_MODULE_NAME)
+    return np is not None and isinstance(value, np.ndarray)
+
+################################################################################
@@ -0,0 +1,97 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from importlib import import_module
+from os import getcwd, scandir
+from os.path import isfile, join
+from types import ModuleType
+from typing import Callable, Tuple
+
+"""
+Registry of the days. The day packages (day_XX directories with a day_XX.py
+module) are found by their names only, none of them is imported until one of its
+puzzles is about to be solved; then only that single module is loaded.
+"""
+
+################################################################################
+
+DAY_PACKAGE_PREFIX = "day_"
+DAY_NUMBER_DIGITS = 2
+
+################################################################################
+
+def day_package_name(day: int) -> str:
+    """
+    :param day: day number
+    :return: name of the day package (and of its module), e.g. "day_01"
+    """
+
+    return "%s%0*d" % (DAY_PACKAGE_PREFIX, DAY_NUMBER_DIGITS, day)
+
+################################################################################
+
+def day_module_name(day: int) -> str:
+    """
+    :param day: day number
+    :return: full name of the module with the day puzzles
+    """
+
+    package = day_package_name(day)
+    return "%s.%s" % (package, package)
+
+################################################################################
+
+def day_module_path(day: int) -> str:
+    """
+    :param day: day number
+    :return: path of the module source file with the day puzzles
+    """
+
+    package = day_package_name(day)
+    return join(getcwd(), package, package + ".py")
+
+################################################################################
+
+def discover_days() -> Tuple[int, ...]:
+    """
+    Finds all the day packages (day_XX directories) in the current working
+    directory without importing any of them.
+
+    :return: sorted numbers of the available days
+    """
+
+    days = []
+    with scandir(getcwd()) as entries:
+        for entry in entries:
+            number = entry.name[len(DAY_PACKAGE_PREFIX):]
+            if entry.name.startswith(DAY_PACKAGE_PREFIX) \
+                    and len(number) == DAY_NUMBER_DIGITS \
+                    and number.isdigit() \
+                    and entry.is_dir() \
+                    and isfile(join(entry.path, entry.name + ".py")):
+                days.append(int(number))
+
+    return tuple(sorted(days))
+
+################################################################################
+
+def load_day(day: int) -> ModuleType:
+    """
+    :param day: day number
+    :return: the day module, imported now unless it already was
+    """
+
+    return import_module(day_module_name(day))
+
+################################################################################
+
+def load_solver(day: int, part: int) -> Callable:
+    """
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :return: the solve function of the puzzle
+    """
+
+    return getattr(load_day(day), "solve_%d" % part)
+
+################################################################################
@@ -0,0 +1,341 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from os.path import join
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from common.input_loader import binary_cache_bypassed, clear_cache, input_path
+from common.registry import day_package_name, load_day, load_solver
+from common.runner import KEY_DAY, KEY_PART, KEY_ANSWER
+
+"""
+Answers regression checks. Every puzzle is solved on the real input and its
+answer is compared with the known one; it has to fit in its time budget as well.
+Any other engine (a function solving the puzzle from the input file path) can be
+checked the same way, against the answers of the reference implementation; the
+alternate engines of a day are those in the REGRESSION_ENGINES of its module.
+The alternate engines are cross-checked on random inputs as well; small and
+big ones, with the irregularities the real inputs do not have (carriage
+returns, blank lines, no newline at the end), against the reference
+implementation.
+"""
+
+################################################################################
+
+# the known answers of the reference implementation, (day, part): answer
+EXPECTED_ANSWERS = {
+    (1, 1): 1184,
+    (1, 2): 1158,
+    (2, 1): 2039912,
+    (2, 2): 1942068080,
+    (3, 1): 841526,
+    (3, 2): 4790390,
+    (4, 1): 55770,
+    (4, 2): 2980,
+    (5, 1): 8111,
+    (5, 2): 22088,
+    (7, 1): 336721,
+    (7, 2): 91638945,
+    (8, 1): 261,
+    (8, 2): 987553,
+    (9, 1): 504,
+    (9, 2): 1558722,
+    (10, 1): 392367,
+    (10, 2): 2192104158,
+    (11, 1): 1697,
+    (11, 2): 344
+}
+
+# time budgets of the puzzles (parsing included) in seconds, (day, part): budget
+TIME_BUDGETS = {
+    (7, 1): 2.0,
+    (7, 2): 120.0
+}
+DEFAULT_TIME_BUDGET = 1.0
+
+STATUS_OK = "OK"
+STATUS_WRONG = "WRONG"
+STATUS_SLOW = "SLOW"
+STATUS_ERROR = "ERROR"
+KEY_EXPECTED = "EXPECTED"
+KEY_TIME = "TIME"
+KEY_BUDGET = "BUDGET"
+KEY_STATUS = "STATUS"
+KEY_ENGINE = "ENGINE"
+ENGINE_REFERENCE = "reference"
+ENGINES_ATTRIBUTE = "REGRESSION_ENGINES"
+KEY_CASES = "CASES"
+KEY_INPUT = "INPUT"
+CROSS_CHECK_SEED = 2021
+CROSS_CHECK_INPUT_NAME = "input.txt"
+# the cross-checks inputs are cut to a random number of records, up to this
+# many (or left whole); a record is a line unless set here otherwise, day:
+# (lines before the records, lines of a record)
+MAX_SMALL_RECORDS_COUNT = 16
+CROSS_CHECK_RECORDS = {
+    4: (1, 6)
+}
+
+################################################################################
+
+def reference_engine(day: int, part: int) -> Callable[[str], int]:
+    """
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :return: the solve function of the day module
+    """
+
+    return load_solver(day, part)
+
+################################################################################
+
+def alternate_engines(day: int, part: int) -> Dict[str, Callable[[str], int]]:
+    """
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :return: the alternate engines of the puzzle in the day module (optimised
+    implementations expected to give the same answers as the reference one),
+    engine name: engine
+    """
+
+    return getattr(load_day(day), ENGINES_ATTRIBUTE, {}).get(part, {})
+
+################################################################################
+
+def check_puzzle(day: int, part: int, engine: Callable[[str], int] = None) -> Dict[str, Union[int, float, str, None]]:
+    """
+    Solves the puzzle with the engine on the day input and checks its answer and
+    time. The parsed inputs cache is cleared first and the binary cache of the
+    parsed inputs is bypassed, so parsing the text is always included in the
+    time.
+
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :param engine: function solving the puzzle from the input file path; the
+    reference implementation by default
+    :return: the answer, expected answer, time, time budget and the status of
+    the check
+    """
+
+    if engine is None:
+        engine = reference_engine(day, part)
+    budget = TIME_BUDGETS.get((day, part), DEFAULT_TIME_BUDGET)
+    expected = EXPECTED_ANSWERS[(day, part)]
+
+    clear_cache()
+    start = perf_counter()
+    try:
+        with binary_cache_bypassed():
+            answer = engine(input_path(day_package_name(day)))
+    except Exception as error:
+        answer = "%s: %s" % (type(error).__name__, error)
+        status = STATUS_ERROR
+    else:
+        status = STATUS_OK
+    time = perf_counter() - start
+
+    if status == STATUS_OK:
+        if answer != expected:
+            status = STATUS_WRONG
+        elif time > budget:
+            status = STATUS_SLOW
+
+    return {
+        KEY_DAY: day,
+        KEY_PART: part,
+        KEY_ANSWER: answer,
+        KEY_EXPECTED: expected,
+        KEY_TIME: time,
+        KEY_BUDGET: budget,
+        KEY_STATUS: status
+    }
+
+################################################################################
+
+def run_regression(days: Tuple[int, ...], parts: Tuple[int, ...],
+                   engines: Dict[Tuple[int, int], Callable[[str], int]] = None,
+                   alternates: bool = False) -> List[Dict[str, Union[int, float, str, None]]]:
+    """
+    :param days: selected days
+    :param parts: selected puzzles of each day
+    :param engines: engines to check instead of the reference implementation,
+    (day, part): engine; puzzles without one are checked with the reference
+    :param alternates: whether to check the alternate engines of the puzzles
+    as well (see alternate_engines)
+    :return: results of all the checks, ordered by day and part; the alternate
+    engines of a puzzle follow its main check
+    """
+
+    if engines is None:
+        engines = {}
+
+    results = []
+    for day in days:
+        for part in parts:
+            if (day, part) not in EXPECTED_ANSWERS:
+                continue
+            result = check_puzzle(day, part, engines.get((day, part)))
+            result[KEY_ENGINE] = ENGINE_REFERENCE if (day, part) not in engines else None
+            results.append(result)
+            if alternates:
+                for name, engine in alternate_engines(day, part).items():
+                    result = check_puzzle(day, part, engine)
+                    result[KEY_ENGINE] = name
+                    results.append(result)
+
+    return results
+
+################################################################################
+
+def format_check(result: Dict[str, Union[int, float, str, None]]) -> str:
+    """
+    :param result: result of one check
+    :return: one line of the checks table
+    """
+
+    line = "day %02d, part %d: %-5s | %9.3f ms of %9.3f ms" % (
+        result[KEY_DAY], result[KEY_PART], result[KEY_STATUS],
+        result[KEY_TIME] * 1000, result[KEY_BUDGET] * 1000)
+    if result.get(KEY_ENGINE) not in (None, ENGINE_REFERENCE):
+        line += " | %s" % result[KEY_ENGINE]
+    if result[KEY_STATUS] in (STATUS_WRONG, STATUS_ERROR):
+        line += " | got %s, expected %s" % (result[KEY_ANSWER], result[KEY_EXPECTED])
+    return line
+
+################################################################################
+
+def random_input(day: int, rnd: Random) -> str:
+    """
+    Generates a random input (see benchmarks.generators) and roughens it up; it
+    is cut to a few records half of the time, its line ends may be carriage
+    returns and line feeds, blank lines may be inserted and the last newline
+    may be missing.
+
+    :param day: day number
+    :param rnd: random numbers generator
+    :return: contents of the input file
+    """
+
+    from benchmarks.generators import GENERATORS
+
+    lines = GENERATORS[day](1, rnd).splitlines()
+    header, record = CROSS_CHECK_RECORDS.get(day, (0, 1))
+    if rnd.random() < 0.5:
+        records_count = rnd.randint(1, min(MAX_SMALL_RECORDS_COUNT, (len(lines) - header) // record))
+        lines = lines[:header + records_count * record]
+    if rnd.random() < 0.25:
+        for _ in range(rnd.randint(1, 4)):
+            lines.insert(rnd.randint(header, len(lines)), "")
+    if rnd.random() < 0.25:
+        lines.extend([""] * rnd.randint(1, 3))
+
+    line_end = "\r\n" if rnd.random() < 0.5 else "\n"
+    text = line_end.join(lines)
+    return text if rnd.random() < 0.25 else text + line_end
+
+################################################################################
+
+def _outcome(engine: Callable[[str], Any], path: str) -> Any:
+    """
+    :param engine: function solving the puzzle from the input file path
+    :param path: input file path
+    :return: the answer of the engine, the type of the error if it failed
+    """
+
+    clear_cache()
+    try:
+        with binary_cache_bypassed():
+            return engine(path)
+    except Exception as error:
+        return type(error)
+
+################################################################################
+
+def cross_check(day: int, part: int, cases: int, seed: int = CROSS_CHECK_SEED) -> List[Dict[str, Union[int, str, None]]]:
+    """
+    Solves the puzzle on random inputs (see random_input) by the reference
+    implementation and by all its alternate engines (see alternate_engines);
+    every engine has to give the same answer as the reference one, or fail with
+    the same type of error.
+
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :param cases: number of random inputs
+    :param seed: random numbers generator seed, the same seed creates the same
+    inputs
+    :return: result of each alternate engine; the number of inputs it was
+    checked on and the status, along with the answers and the input of the
+    first mismatch if there was one
+    """
+
+    engines = alternate_engines(day, part)
+    reference = reference_engine(day, part)
+    results = {name: {
+        KEY_DAY: day,
+        KEY_PART: part,
+        KEY_ENGINE: name,
+        KEY_CASES: cases,
+        KEY_STATUS: STATUS_OK
+    } for name in engines}
+
+    rnd = Random("%d-%d-%d" % (seed, day, part))
+    with TemporaryDirectory() as dir_path:
+        path = join(dir_path, CROSS_CHECK_INPUT_NAME)
+        for _ in range(cases if len(engines) > 0 else 0):
+            text = random_input(day, rnd)
+            with open(path, "w", newline="") as f:
+                f.write(text)
+            expected = _outcome(reference, path)
+            for name, engine in engines.items():
+                answer = _outcome(engine, path)
+                if results[name][KEY_STATUS] == STATUS_OK and answer != expected:
+                    results[name].update({
+                        KEY_STATUS: STATUS_WRONG,
+                        KEY_ANSWER: answer.__name__ if isinstance(answer, type) else answer,
+                        KEY_EXPECTED: expected.__name__ if isinstance(expected, type) else expected,
+                        KEY_INPUT: text
+                    })
+        clear_cache()
+
+    return list(results.values())
+
+################################################################################
+
+def run_cross_checks(days: Tuple[int, ...], parts: Tuple[int, ...], cases: int,
+                     seed: int = CROSS_CHECK_SEED) -> List[Dict[str, Union[int, str, None]]]:
+    """
+    :param days: selected days
+    :param parts: selected puzzles of each day
+    :param cases: number of random inputs of each puzzle
+    :param seed: random numbers generator seed
+    :return: results of the cross-checks of all the alternate engines (see
+    cross_check), ordered by day and part
+    """
+
+    from benchmarks.generators import GENERATORS, UNSOLVABLE
+
+    return [result
+            for day in days
+            for part in parts
+            if day in GENERATORS and (day, part) not in UNSOLVABLE
+            for result in cross_check(day, part, cases, seed)]
+
+################################################################################
+
+def format_cross_check(result: Dict[str, Union[int, str, None]]) -> str:
+    """
+    :param result: result of the cross-check of one engine
+    :return: one line of the cross-checks table, followed by the input of the
+    mismatch if there was one
+    """
+
+    line = "day %02d, part %d: %-5s | %d random inputs | %s" % (
+        result[KEY_DAY], result[KEY_PART], result[KEY_STATUS], result[KEY_CASES], result[KEY_ENGINE])
+    if result[KEY_STATUS] != STATUS_OK:
+        line += " | got %s, expected %s, input %r" % (result[KEY_ANSWER], result[KEY_EXPECTED], result[KEY_INPUT])
+    return line
+
+################################################################################
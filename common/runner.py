@@ -0,0 +1,234 @@
+__author__ = "Tofu Gang"
+__email__ = "tofugangsw@gmail.com"
+
+from contextlib import nullcontext
+from os.path import join
+from time import perf_counter
+from typing import Dict, Iterator, List, Tuple, Union
+
+from common.answer_cache import AnswerCache, answer_key
+from common.input_loader import input_path
+from common.instrumentation import is_enabled, phase_timings, profiled, reset_timings
+from common.registry import day_module_path, day_package_name, load_day
+
+"""
+Runs the selected puzzles of the selected days in a single process. Day modules
+are imported lazily, only once a puzzle of that day is about to be run; the
+process pool machinery is imported only if the puzzles are run in parallel. With
+an answer cache, puzzles already solved on the same input by the same solver are
+not run at all.
+"""
+
+################################################################################
+
+PARTS = (1, 2)
+SELECTOR_ALL = "all"
+KEY_DAY = "DAY"
+KEY_PART = "PART"
+KEY_ANSWER = "ANSWER"
+KEY_PARSE_TIME = "PARSE_TIME"
+KEY_SOLVE_TIME = "SOLVE_TIME"
+KEY_PHASES = "PHASES"
+KEY_CACHED = "CACHED"
+
+################################################################################
+
+def parse_selector(selector: Union[str, List[str]], available: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    :param selector: "all" or a list of numbers (e.g. ["1", "3", "11"]), the
+    numbers may be comma separated as well (e.g. ["1,3,11"])
+    :param available: numbers that can be selected
+    :return: sorted selected numbers
+    """
+
+    if isinstance(selector, str):
+        selector = [selector]
+    values = [value.strip()
+              for item in selector
+              for value in item.split(",")
+              if len(value.strip()) > 0]
+
+    if SELECTOR_ALL in values:
+        return available
+
+    selected = set()
+    for value in values:
+        number = int(value)
+        if number not in available:
+            raise ValueError("%d is not available, choose from %s"
+                             % (number, ", ".join(str(item) for item in available)))
+        selected.add(number)
+
+    return tuple(sorted(selected))
+
+################################################################################
+
+def _cached_result(day: int, part: int, answers: AnswerCache) -> Tuple[Tuple[int, int, str, str], Union[Dict[str, Union[int, float, bool]], None]]:
+    """
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :param answers: answer cache
+    :return: key of the puzzle answer and the puzzle result made of the cached
+    answer, None if it is not cached; the time of the lookup is reported as the
+    solve time
+    """
+
+    start = perf_counter()
+    key = answer_key(day, part, input_path(day_package_name(day)), day_module_path(day))
+    answer = answers.get(key)
+    if answer is None:
+        return key, None
+
+    return key, {
+        KEY_DAY: day,
+        KEY_PART: part,
+        KEY_ANSWER: answer,
+        KEY_PARSE_TIME: 0.0,
+        KEY_SOLVE_TIME: perf_counter() - start,
+        KEY_CACHED: True
+    }
+
+################################################################################
+
+def run_puzzle(day: int, part: int, profile_dir: str = None) -> Dict[str, Union[int, float, Dict[str, float]]]:
+    """
+    Imports the day module (if not already imported) and solves one of its
+    puzzles. The input is parsed first, so the parse time is reported separately
+    from the solve time.
+
+    :param day: day number
+    :param part: puzzle number (1 or 2)
+    :param profile_dir: if set, the puzzle is profiled and the stats are dumped
+    to day_XX_part_N.prof file in this directory
+    :return: the answer along with the parse and solve times (in seconds); the
+    phase times as well if the instrumentation is on
+    """
+
+    module = load_day(day)
+    solve = getattr(module, "solve_%d" % part)
+
+    reset_timings()
+    with nullcontext() if profile_dir is None \
+            else profiled(join(profile_dir, "day_%02d_part_%d.prof" % (day, part))):
+        start = perf_counter()
+        data = module.parse_input()
+        parse_time = perf_counter() - start
+
+        start = perf_counter()
+        answer = solve(data)
+        solve_time = perf_counter() - start
+
+    result = {
+        KEY_DAY: day,
+        KEY_PART: part,
+        KEY_ANSWER: answer,
+        KEY_PARSE_TIME: parse_time,
+        KEY_SOLVE_TIME: solve_time
+    }
+    if is_enabled():
+        result[KEY_PHASES] = phase_timings()
+
+    return result
+
+################################################################################
+
+def run_puzzles(days: Tuple[int, ...], parts: Tuple[int, ...], profile_dir: str = None,
+                answers: AnswerCache = None) -> Iterator[Dict[str, Union[int, float, bool, Dict[str, float]]]]:
+    """
+    Runs all the selected puzzles one by one in this process.
+
+    :param days: selected days
+    :param parts: selected puzzles of each day
+    :param profile_dir: if set, the puzzles are profiled and the stats are
+    dumped to this directory
+    :param answers: if set, cached answers are taken from it instead of running
+    the puzzles and the new answers are added to it
+    :return: results of the puzzles, ordered by day and part
+    """
+
+    for day in days:
+        for part in parts:
+            result = None
+            if answers is not None:
+                key, result = _cached_result(day, part, answers)
+            if result is None:
+                result = run_puzzle(day, part, profile_dir)
+                if answers is not None:
+                    answers.put(key, result[KEY_ANSWER])
+            yield result
+
+################################################################################
+
+def run_puzzles_parallel(days: Tuple[int, ...], parts: Tuple[int, ...], workers: int = None, profile_dir: str = None,
+                         answers: AnswerCache = None) -> Iterator[Dict[str, Union[int, float, bool, Dict[str, float]]]]:
+    """
+    Runs all the selected puzzles in a pool of worker processes, each puzzle is
+    sent to a worker on its own. The days are independent, so the whole run
+    takes about as long as the slowest puzzle (given enough workers).
+
+    :param days: selected days
+    :param parts: selected puzzles of each day
+    :param workers: number of worker processes, one per CPU core by default
+    :param profile_dir: if set, the puzzles are profiled and the stats are
+    dumped to this directory
+    :param answers: if set, cached answers are taken from it instead of running
+    the puzzles and the new answers are added to it; the cache is used by this
+    process only, the workers get just the puzzles that are not cached
+    :return: results of the puzzles in the order they finish, cached ones first
+    """
+
+    keys = {}
+    puzzles = []
+    for day in days:
+        for part in parts:
+            if answers is not None:
+                keys[(day, part)], result = _cached_result(day, part, answers)
+                if result is not None:
+                    yield result
+                    continue
+            puzzles.append((day, part))
+    if len(puzzles) == 0:
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_puzzle, day, part, profile_dir) for day, part in puzzles]
+        for future in as_completed(futures):
+            result = future.result()
+            if answers is not None:
+                answers.put(keys[(result[KEY_DAY], result[KEY_PART])], result[KEY_ANSWER])
+            yield result
+
+################################################################################
+
+def format_time(seconds: float) -> str:
+    """
+    :param seconds: measured time
+    :return: time in milliseconds, aligned for the results table
+    """
+
+    return "%9.3f ms" % (seconds * 1000)
+
+################################################################################
+
+def format_result(result: Dict[str, Union[int, float, bool, Dict[str, float]]]) -> str:
+    """
+    :param result: result of one puzzle
+    :return: one line of the results table, followed by the phase times if
+    there are any
+    """
+
+    line = "day %02d, part %d: %16s | parse %s | solve %s" % (
+        result[KEY_DAY],
+        result[KEY_PART],
+        result[KEY_ANSWER],
+        format_time(result[KEY_PARSE_TIME]),
+        format_time(result[KEY_SOLVE_TIME]))
+    if result.get(KEY_CACHED, False):
+        line += " | cached"
+    for name, seconds in result.get(KEY_PHASES, {}).items():
+        line += "\n    %-6s %s" % (name, format_time(seconds))
+    return line
+
+################################################################################
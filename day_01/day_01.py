@@ -1,8 +1,17 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
+from array import array
+from collections import deque
+from functools import partial
+from os import cpu_count, fstat, stat
+from os.path import getsize
+from time import sleep
+from typing import Any, Callable, Iterable, Iterator, Tuple, Union
+
+from common.input_loader import STREAM_BLOCK_SIZE, chunk_ranges, input_path, iter_ints, \
+    load_parsed, read_ints, read_range
+from common.optional import has_numpy, is_ndarray, numpy
 
 """
 --- Day 1: Sonar Sweep ---
@@ -11,7 +20,324 @@ from os.path import join
 ################################################################################
 
 SELF_DIR_NAME = "day_01"
-INPUT_TXT_NAME = "input.txt"
+MEASUREMENT_WINDOW_SIZE = 1
+SLIDING_WINDOW_SIZE = 3
+# smallest input (in bytes) parsed by NumPy; below it, importing NumPy takes
+# longer than parsing the input without it
+NUMPY_MIN_INPUT_SIZE = 1 << 20
+
+################################################################################
+
+def _read_depths_numpy(path: str) -> Any:
+    """
+    :param path: input file path
+    :return: depths from the sonar sweep report as a NumPy array, parsed by
+    NumPy itself
+    """
+
+    np = numpy()
+    return np.fromfile(path, dtype=np.int64, sep=" ")
+
+################################################################################
+
+def parse_input(path: str = None) -> Any:
+    """
+    :param path: input file path, the day input by default
+    :return: depths from the sonar sweep report; a NumPy array if NumPy is
+    installed and the input is big enough to pay for importing it (see
+    NUMPY_MIN_INPUT_SIZE), an integer array otherwise
+    """
+
+    if path is None:
+        path = input_path(SELF_DIR_NAME)
+    use_numpy = has_numpy() and getsize(path) >= NUMPY_MIN_INPUT_SIZE
+    return load_parsed(path, _read_depths_numpy if use_numpy else read_ints)
+
+################################################################################
+
+def count_increases(depths: Union[Iterable[int], str], window_size: int = MEASUREMENT_WINDOW_SIZE) -> int:
+    """
+    Counts the sliding window sums larger than the previous sum in a single
+    pass, in constant memory. Two neighbouring windows share all but one
+    measurement each, so the later sum is larger exactly when its newest
+    measurement is larger than the oldest measurement of the earlier window;
+    only the last window_size measurements are kept to compare the depth with
+    the one window_size measurements back.
+
+    :param depths: depths from the sonar sweep report, any iterable of them or
+    the input file path (streamed, not loaded as a whole); NumPy arrays are
+    counted by count_increases_numpy()
+    :param window_size: number of measurements in the window, 1 compares the
+    single measurements
+    :return: number of window sums larger than the previous sum
+    """
+
+    if window_size < 1:
+        raise ValueError("window size must be positive, not %d" % window_size)
+    if is_ndarray(depths):
+        return count_increases_numpy(depths, window_size)
+    if isinstance(depths, str):
+        depths = iter_ints(depths)
+
+    window = deque(maxlen=window_size)
+    count = 0
+    for depth in depths:
+        if len(window) == window_size and depth > window[0]:
+            count += 1
+        window.append(depth)
+
+    return count
+
+################################################################################
+
+def count_increases_numpy(depths: Any, window_size: int = MEASUREMENT_WINDOW_SIZE) -> int:
+    """
+    Vectorised count of the sliding window sums larger than the previous sum;
+    the array shifted by window_size is compared with itself as a whole (see
+    count_increases).
+
+    :param depths: depths from the sonar sweep report as a NumPy array
+    :param window_size: number of measurements in the window
+    :return: number of window sums larger than the previous sum
+    """
+
+    return int(numpy().count_nonzero(depths[window_size:] > depths[:max(0, len(depths) - window_size)]))
+
+################################################################################
+
+def _count_chunk(path: str, window_size: int, chunk: Tuple[int, int]) -> Tuple[int, Tuple[int, ...], Tuple[int, ...]]:
+    """
+    :param path: input file path
+    :param window_size: number of measurements in the window
+    :param chunk: byte range (start, end) of the file, made of whole lines
+    :return: summary of the chunk; number of window sums larger than the
+    previous sum within the chunk, and its first and last window_size depths
+    (all of them if there are fewer)
+    """
+
+    # tokenised the same way as the whole file is (see read_ints), so a chunk
+    # of blank lines has no depths and a bad token raises ValueError
+    data = read_range(path, *chunk)
+    depths = array("q", map(int, data.split()))
+    if len(depths) == 0:
+        return 0, (), ()
+    if has_numpy() and len(data) >= NUMPY_MIN_INPUT_SIZE:
+        depths = numpy().frombuffer(depths, dtype=numpy().int64)
+
+    return count_increases(depths, window_size), \
+        tuple(int(depth) for depth in depths[:window_size]), \
+        tuple(int(depth) for depth in depths[max(0, len(depths) - window_size):])
+
+################################################################################
+
+def count_increases_parallel(path: str, window_size: int = MEASUREMENT_WINDOW_SIZE, workers: int = None) -> int:
+    """
+    Counts the sliding window sums larger than the previous sum (see
+    count_increases) of a big input file in a pool of worker processes. The
+    memory-mapped file is split into ranges of whole lines, each counted on its
+    own; the comparisons across the chunk boundaries (a depth in the first
+    window_size depths of a chunk with the depth window_size back, in the
+    chunks before) are added when the chunk summaries are stitched together, so
+    the count is exact.
+
+    :param path: input file path
+    :param window_size: number of measurements in the window
+    :param workers: number of worker processes, one per CPU core by default
+    :return: number of window sums larger than the previous sum
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if window_size < 1:
+        raise ValueError("window size must be positive, not %d" % window_size)
+    if workers is None:
+        workers = cpu_count() or 1
+    chunks = chunk_ranges(path, workers)
+
+    count = 0
+    # last window_size depths of all the chunks stitched so far
+    tail = ()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_count, chunk_head, chunk_tail in executor.map(partial(_count_chunk, path, window_size), chunks):
+            count += chunk_count
+            for i in range(len(chunk_head)):
+                # the depth window_size back is in the previous chunks
+                back = window_size - i
+                if back <= len(tail) and chunk_head[i] > tail[-back]:
+                    count += 1
+            tail = (tail + chunk_tail)[-window_size:]
+
+    return count
+
+################################################################################
+
+def _is_replaced(path: str, descriptor: int) -> bool:
+    """
+    :param path: file path
+    :param descriptor: descriptor of the file opened from the path
+    :return: whether another file is at the path now (the opened one was
+    replaced, e.g. renamed over); a missing file is not considered replaced
+    yet, the new one may be on its way
+    """
+
+    try:
+        path_stats = stat(path)
+    except FileNotFoundError:
+        return False
+    descriptor_stats = fstat(descriptor)
+    return (path_stats.st_dev, path_stats.st_ino) != (descriptor_stats.st_dev, descriptor_stats.st_ino)
+
+################################################################################
+
+class DepthIncreaseCounter(object):
+    # seconds to wait for new readings when tailing the input file
+    POLL_INTERVAL = 0.5
+
+################################################################################
+
+    def __init__(self, window_sizes: Tuple[int, ...] = (MEASUREMENT_WINDOW_SIZE, SLIDING_WINDOW_SIZE)):
+        """
+        Incremental count of the sliding window sums larger than the previous
+        sum, for depths arriving one by one. Only the last depths (as many as
+        the biggest window) are kept, each reading costs a constant time.
+
+        :param window_sizes: numbers of measurements in the windows to count
+        the increases of; by default both puzzles are counted
+        """
+
+        super().__init__()
+
+        if any(window_size < 1 for window_size in window_sizes):
+            raise ValueError("window sizes must be positive, not %s" % (window_sizes,))
+        self._window_sizes = tuple(window_sizes)
+        self._last_depths = deque(maxlen=max(self._window_sizes, default=0))
+        self._counts = [0] * len(self._window_sizes)
+        self._readings_count = 0
+
+################################################################################
+
+    @property
+    def counts(self) -> Tuple[int, ...]:
+        """
+        :return: number of window sums larger than the previous sum so far, for
+        each of the window sizes
+        """
+
+        return tuple(self._counts)
+
+################################################################################
+
+    @property
+    def readings_count(self) -> int:
+        """
+        :return: number of depths pushed so far
+        """
+
+        return self._readings_count
+
+################################################################################
+
+    def reset(self) -> None:
+        """
+        Forgets all the depths pushed so far.
+        """
+
+        self._last_depths.clear()
+        self._counts = [0] * len(self._window_sizes)
+        self._readings_count = 0
+
+################################################################################
+
+    def push(self, depth: int) -> None:
+        """
+        :param depth: next depth from the sonar sweep
+        """
+
+        last_depths = self._last_depths
+        for i, window_size in enumerate(self._window_sizes):
+            # the depth window_size back (see count_increases)
+            if len(last_depths) >= window_size and depth > last_depths[-window_size]:
+                self._counts[i] += 1
+        last_depths.append(depth)
+        self._readings_count += 1
+
+################################################################################
+
+    def push_many(self, depths: Iterable[int]) -> None:
+        """
+        :param depths: next depths from the sonar sweep, in order
+        """
+
+        for depth in depths:
+            self.push(depth)
+
+################################################################################
+
+    def follow(self, path: str = None, stop: Callable[[], bool] = None,
+               block_size: int = STREAM_BLOCK_SIZE) -> Iterator[Tuple[int, ...]]:
+        """
+        Tails the growing input file; every complete line appended to it is
+        pushed as soon as it is found. The file is read block by block, so a
+        big file is followed in constant memory too. If the file gets shorter
+        (it was truncated) or another file takes its path (it was replaced),
+        the counts start over from its beginning. Once following stops, the
+        last line is pushed even if it does not end with a newline.
+
+        :param path: input file path, the day input by default
+        :param stop: called while waiting for new readings, following ends once
+        it returns True; it goes on forever by default
+        :param block_size: maximum number of bytes read at once
+        :return: the current counts (see counts), each time new depths were
+        pushed (after each block of them)
+        """
+
+        if path is None:
+            path = input_path(SELF_DIR_NAME)
+
+        f = open(path, "rb")
+        try:
+            rest = b""
+            while True:
+                if fstat(f.fileno()).st_size < f.tell():
+                    f.seek(0)
+                    rest = b""
+                    self.reset()
+                block = f.read(block_size)
+                data = rest + block
+                # the last line may not have been written completely yet (or
+                # it goes on in the next block)
+                end = data.rfind(b"\n") + 1
+                rest = data[end:]
+                if end > 0:
+                    self.push_many(map(int, data[:end].split()))
+                    yield self.counts
+                elif len(block) > 0:
+                    continue
+                elif _is_replaced(path, f.fileno()):
+                    f.close()
+                    f = open(path, "rb")
+                    rest = b""
+                    self.reset()
+                elif stop is not None and stop():
+                    if len(rest.strip()) > 0:
+                        self.push_many(map(int, rest.split()))
+                        yield self.counts
+                    return
+                else:
+                    sleep(self.POLL_INTERVAL)
+        finally:
+            f.close()
+
+################################################################################
+
+def solve_1(data: Union[array, Any, str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: number of measurements larger than the previous measurement
+    """
+
+    depths = parse_input(data) if isinstance(data, str) else data
+    return count_increases(depths, MEASUREMENT_WINDOW_SIZE)
 
 ################################################################################
 
@@ -67,10 +393,20 @@ def puzzle_1() -> None:
     How many measurements are larger than the previous measurement?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        depths = [int(depth.strip()) for depth in f.readlines()]
-        # should be 1184
-        print(len([depths[i] for i in range(1, len(depths)) if depths[i] > depths[i - 1]]))
+    # should be 1184
+    print(solve_1(parse_input()))
+
+################################################################################
+
+def solve_2(data: Union[array, Any, str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: number of three-measurement sliding window sums larger than the
+    previous sum
+    """
+
+    depths = parse_input(data) if isinstance(data, str) else data
+    return count_increases(depths, SLIDING_WINDOW_SIZE)
 
 ################################################################################
 
@@ -124,10 +460,36 @@ def puzzle_2() -> None:
     larger than the previous sum?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        depths = [int(depth.strip()) for depth in f.readlines()]
-        windows = [sum(depths[i:i + 3]) for i in range(len(depths) - 2)]
-        # should be 1158
-        print(len([windows[i] for i in range(1, len(windows)) if windows[i] > windows[i - 1]]))
+    # should be 1158
+    print(solve_2(parse_input()))
+
+################################################################################
+
+def _count_increases_followed(path: str, window_size: int) -> int:
+    """
+    :param path: input file path
+    :param window_size: number of measurements in the window
+    :return: number of window sums larger than the previous sum, counted by
+    following the file once to its end (see DepthIncreaseCounter.follow)
+    """
+
+    counter = DepthIncreaseCounter((window_size,))
+    for _ in counter.follow(path, lambda: True):
+        pass
+    return counter.counts[0]
+
+################################################################################
+
+# see common.regression.alternate_engines
+REGRESSION_ENGINES = {
+    1: {
+        "parallel": lambda path: count_increases_parallel(path, MEASUREMENT_WINDOW_SIZE, workers=2),
+        "follow": lambda path: _count_increases_followed(path, MEASUREMENT_WINDOW_SIZE)
+    },
+    2: {
+        "parallel": lambda path: count_increases_parallel(path, SLIDING_WINDOW_SIZE, workers=2),
+        "follow": lambda path: _count_increases_followed(path, SLIDING_WINDOW_SIZE)
+    }
+}
 
 ################################################################################
\ No newline at end of file
@@ -1,8 +1,14 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
+from array import array
+from functools import partial, reduce
+from io import BytesIO
+from os import cpu_count
+from typing import Iterable, Sequence, Tuple, Union
+
+from common.input_loader import binary_cached, chunk_ranges, input_path, load_parsed, read_range
+from common.optional import has_numpy, numpy
 
 """
 --- Day 2: Dive! ---
@@ -13,10 +19,215 @@ Now, you need to figure out how to pilot this thing.
 ################################################################################
 
 SELF_DIR_NAME = "day_02"
-INPUT_TXT_NAME = "input.txt"
 INSTRUCTION_FORWARD = "forward"
 INSTRUCTION_UP = "up"
 INSTRUCTION_DOWN = "down"
+# instructions are told apart by their first byte, their values follow the
+# instruction and a space
+OPCODE_FORWARD = ord(INSTRUCTION_FORWARD[0])
+OPCODE_UP = ord(INSTRUCTION_UP[0])
+OPCODE_DOWN = ord(INSTRUCTION_DOWN[0])
+VALUE_OFFSET_FORWARD = len(INSTRUCTION_FORWARD) + 1
+VALUE_OFFSET_UP = len(INSTRUCTION_UP) + 1
+VALUE_OFFSET_DOWN = len(INSTRUCTION_DOWN) + 1
+# all the letters of the instructions; without them, only the values are left
+INSTRUCTION_LETTERS = bytes(sorted(set((INSTRUCTION_FORWARD + INSTRUCTION_UP + INSTRUCTION_DOWN).encode())))
+
+################################################################################
+
+def pilot(course: Union[Iterable[bytes], str]) -> Tuple[int, int, int]:
+    """
+    Follows the planned course in a single pass, in constant memory. Every line
+    is read once; the instruction is recognised by its first byte and the value
+    is converted right from the bytes after it. Both puzzles are computed at
+    once: the aim changes exactly like the depth of the first puzzle does.
+
+    :param course: planned course; lines of instructions (as bytes) or the input
+    file path (streamed, not loaded as a whole)
+    :return: final horizontal position, aim (the final depth of the first
+    puzzle) and depth (the final depth of the second puzzle)
+    """
+
+    if isinstance(course, str):
+        with open(course, "rb") as f:
+            return pilot(f)
+
+    x_position = 0
+    aim = 0
+    depth = 0
+    for line in course:
+        opcode = line[0] if len(line) > 0 else None
+        if opcode == OPCODE_FORWARD:
+            value = int(line[VALUE_OFFSET_FORWARD:])
+            x_position += value
+            depth += aim * value
+        elif opcode == OPCODE_DOWN:
+            aim += int(line[VALUE_OFFSET_DOWN:])
+        elif opcode == OPCODE_UP:
+            aim -= int(line[VALUE_OFFSET_UP:])
+        elif len(line.strip()) > 0:
+            raise ValueError("unknown instruction: %r" % line)
+
+    return x_position, aim, depth
+
+################################################################################
+
+def combine_courses(first: Tuple[int, int, int], second: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    """
+    Joins the results of two consecutive parts of a course, both followed from
+    zero aim (see pilot). The second part is followed with the aim the first
+    one ended with, so every forward of it goes deeper by that aim times its
+    value as well. The operation is associative, so the course can be split
+    into any chunks followed independently.
+
+    :param first: horizontal position, aim and depth changes of the first part
+    :param second: horizontal position, aim and depth changes of the second part
+    :return: horizontal position, aim and depth changes of both parts
+    """
+
+    x_1, aim_1, depth_1 = first
+    x_2, aim_2, depth_2 = second
+    return x_1 + x_2, aim_1 + aim_2, depth_1 + depth_2 + aim_1 * x_2
+
+################################################################################
+
+def _pilot_chunk(path: str, chunk: Tuple[int, int]) -> Tuple[int, int, int]:
+    """
+    :param path: input file path
+    :param chunk: byte range (start, end) of the file, made of whole lines
+    :return: horizontal position, aim and depth changes of the chunk, followed
+    from zero aim
+    """
+
+    return pilot(BytesIO(read_range(path, *chunk)))
+
+################################################################################
+
+def pilot_parallel(path: str, workers: int = None) -> Tuple[int, int, int]:
+    """
+    Follows the planned course (see pilot) in a pool of worker processes. The
+    memory-mapped input file is split into ranges of whole lines, each one is
+    followed from zero aim on its own and their results are joined in order by
+    combine_courses.
+
+    :param path: input file path
+    :param workers: number of worker processes, one per CPU core by default
+    :return: final horizontal position, aim and depth
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if workers is None:
+        workers = cpu_count() or 1
+    chunks = chunk_ranges(path, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return reduce(combine_courses, executor.map(partial(_pilot_chunk, path), chunks), (0, 0, 0))
+
+################################################################################
+
+@binary_cached("course", lambda course: course, lambda arrays: arrays)
+def _pack_course(path: str) -> Tuple[array, array]:
+    """
+    Packs the planned course into two arrays; the instructions as their first
+    bytes (opcodes, see OPCODE_FORWARD, ...) and their values. The text is
+    tokenised only once: the opcodes are the first bytes of the lines and the
+    values are what remains when the instruction letters are deleted.
+
+    :param path: input file path
+    :return: opcodes (unsigned bytes) and values (integers) of the instructions
+    """
+
+    with open(path, "rb") as f:
+        data = f.read()
+    if has_numpy():
+        np = numpy()
+        characters = np.frombuffer(data, dtype=np.uint8)
+        starts = np.concatenate(([0], np.flatnonzero(characters == ord("\n")) + 1))
+        starts = starts[starts < len(characters)]
+        opcodes = characters[starts]
+        # skip blank lines (whitespace is below the space and the space itself)
+        opcodes = opcodes[opcodes > ord(" ")]
+        values = np.fromstring(data.translate(None, INSTRUCTION_LETTERS), dtype=np.int32, sep=" ")
+        opcodes, values = array("B", opcodes.tobytes()), array("i", values.tobytes())
+    else:
+        tokens = data.split()
+        opcodes, values = array("B", (token[0] for token in tokens[0::2])), array("i", map(int, tokens[1::2]))
+
+    if len(opcodes) != len(values):
+        raise ValueError("malformed course: %d instructions, %d values" % (len(opcodes), len(values)))
+    return opcodes, values
+
+################################################################################
+
+def parse_input(path: str = None) -> Tuple[Sequence[int], Sequence[int]]:
+    """
+    :param path: input file path, the day input by default
+    :return: planned course; opcodes and values of the instructions (see
+    _pack_course)
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, _pack_course)
+
+################################################################################
+
+def replay(course: Tuple[Sequence[int], Sequence[int]]) -> Tuple[int, int, int]:
+    """
+    Follows the packed course (see pilot). With NumPy, both puzzles are
+    vectorised: the horizontal position and the aim are masked sums of the
+    values, the aim of each instruction is the cumulative sum of the signed up
+    and down values, and the depth is the sum of the aims times the forward
+    values.
+
+    :param course: opcodes and values of the instructions
+    :return: final horizontal position, aim (the final depth of the first
+    puzzle) and depth (the final depth of the second puzzle)
+    """
+
+    opcodes, values = course
+    if has_numpy():
+        np = numpy()
+        opcodes = np.frombuffer(opcodes, dtype=np.uint8)
+        values = np.frombuffer(values, dtype=np.int32)
+        forward = opcodes == OPCODE_FORWARD
+        down = opcodes == OPCODE_DOWN
+        up = opcodes == OPCODE_UP
+        known = forward | down | up
+        if not known.all():
+            raise ValueError("unknown opcode: %d" % opcodes[np.argmin(known)])
+        # multiplying by masks is cheaper than selecting by them
+        forward_values = values * forward
+        aims = np.cumsum(values * down - values * up, dtype=np.int64)
+        return int(forward_values.sum(dtype=np.int64)), \
+            int(aims[-1]) if len(aims) > 0 else 0, \
+            int(np.dot(aims, forward_values.astype(np.int64)))
+
+    x_position = 0
+    aim = 0
+    depth = 0
+    for opcode, value in zip(opcodes, values):
+        if opcode == OPCODE_FORWARD:
+            x_position += value
+            depth += aim * value
+        elif opcode == OPCODE_DOWN:
+            aim += value
+        elif opcode == OPCODE_UP:
+            aim -= value
+        else:
+            raise ValueError("unknown opcode: %d" % opcode)
+
+    return x_position, aim, depth
+
+################################################################################
+
+def solve_1(data: Union[Tuple[Sequence[int], Sequence[int]], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: final horizontal position multiplied by the final depth
+    """
+
+    x_position, depth, _ = replay(parse_input(data) if isinstance(data, str) else data)
+    return x_position * depth
 
 ################################################################################
 
@@ -62,19 +273,19 @@ def puzzle_1() -> None:
     position by your final depth?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        instructions = [instruction.strip() for instruction in f.readlines()]
-        instructions = [(instruction.split(" ")[0],
-                         int(instruction.split(" ")[1].strip()))
-                        for instruction in instructions]
-        x_position = sum([instruction[1] for instruction in instructions
-                          if instruction[0] == INSTRUCTION_FORWARD])
-        depth = sum([instruction[1] for instruction in instructions
-                     if instruction[0] == INSTRUCTION_DOWN]) \
-                - sum([instruction[1] for instruction in instructions
-                       if instruction[0] == INSTRUCTION_UP])
-        # should be 2039912
-        print(x_position * depth)
+    # should be 2039912
+    print(solve_1(parse_input()))
+
+################################################################################
+
+def solve_2(data: Union[Tuple[Sequence[int], Sequence[int]], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: final horizontal position multiplied by the final depth, using aim
+    """
+
+    x_position, _, depth = replay(parse_input(data) if isinstance(data, str) else data)
+    return x_position * depth
 
 ################################################################################
 
@@ -120,27 +331,35 @@ def puzzle_2() -> None:
     depth?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        instructions = [instruction.strip() for instruction in f.readlines()]
-        instructions = [(instruction.split(" ")[0],
-                         int(instruction.split(" ")[1].strip()))
-                        for instruction in instructions]
-        x_position = 0
-        aim = 0
-        depth = 0
-        for instruction in instructions:
-            if instruction[0] == INSTRUCTION_FORWARD:
-                x_position += instruction[1]
-                depth += aim * instruction[1]
-            elif instruction[0] == INSTRUCTION_UP:
-                aim -= instruction[1]
-            elif instruction[0] == INSTRUCTION_DOWN:
-                aim += instruction[1]
-            else:
-                # shouldn't happen
-                raise Exception()
-
-        # should be 1942068080
-        print(x_position * depth)
+    # should be 1942068080
+    print(solve_2(parse_input()))
+
+################################################################################
+
+def _solve_piloted(path: str, part: int, parallel: bool) -> int:
+    """
+    :param path: input file path
+    :param part: puzzle number (1 or 2)
+    :param parallel: whether to follow the course in two worker processes
+    (see pilot_parallel) or in this one (see pilot)
+    :return: final horizontal position multiplied by the final depth
+    """
+
+    x_position, aim, depth = pilot_parallel(path, workers=2) if parallel else pilot(path)
+    return x_position * (aim if part == 1 else depth)
+
+################################################################################
+
+# see common.regression.alternate_engines
+REGRESSION_ENGINES = {
+    1: {
+        "pilot": lambda path: _solve_piloted(path, 1, False),
+        "parallel": lambda path: _solve_piloted(path, 1, True)
+    },
+    2: {
+        "pilot": lambda path: _solve_piloted(path, 2, False),
+        "parallel": lambda path: _solve_piloted(path, 2, True)
+    }
+}
 
 ################################################################################
\ No newline at end of file
@@ -1,8 +1,15 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
 from os.path import join
+from tempfile import TemporaryDirectory
+from typing import Any, Iterator, List, Sequence, Tuple, Union
+
+from common.input_loader import STREAM_BLOCK_SIZE, input_path, load_parsed, read_bytes
+from common.optional import has_numpy, numpy
 
 """
 --- Day 3: Binary Diagnostic ---
@@ -18,7 +25,560 @@ conditions of the submarine.
 ################################################################################
 
 SELF_DIR_NAME = "day_03"
-INPUT_TXT_NAME = "input.txt"
+LINE_END = b"\n"
+# widest numbers NumPy holds as unsigned 64-bit integers (the top bit is kept
+# free for the shifts of the search)
+NUMPY_MAX_WIDTH = 63
+# memory the out-of-core mode may use by default, in bytes
+DEFAULT_MEMORY_BUDGET = 64 << 20
+# the blocks read take 1/BLOCK_BUDGET_SHARE of the budget, processing them
+# takes the rest
+BLOCK_BUDGET_SHARE = 8
+# at most 2^MAX_BUCKET_BITS prefix buckets are counted in a single pass
+MAX_BUCKET_BITS = 16
+# estimated memory taken by a binary number sorted in memory, besides its text
+IN_MEMORY_NUMBER_SIZE = 64
+
+################################################################################
+
+def _read_report(path: str) -> Union[bytes, Any]:
+    """
+    :param path: input file path
+    :return: the diagnostic report; lines of the same width, each one ended by
+    a newline but maybe the last one. The memory-mapped file is used as it is
+    unless it has to be cleaned up (carriage returns, blank lines or spaces
+    around the numbers), only then it is copied
+    """
+
+    report = read_bytes(path)
+    if report.find(b"\r") >= 0 or report.find(LINE_END * 2) >= 0 \
+            or report[:1].isspace() or report[-2:].isspace():
+        report = LINE_END.join(report[:].split()) + LINE_END
+    if len(report) == 0 or report[:len(LINE_END) + 1] == LINE_END:
+        # no numbers at all
+        return b""
+
+    width = report_width(report)
+    rows = report_rows(report)
+    # every line ends right after width characters, and there are no other
+    # line ends; counted block by block, so a memory map is not copied whole
+    newlines = sum(report[start:start + STREAM_BLOCK_SIZE].count(LINE_END)
+                   for start in range(0, len(report), STREAM_BLOCK_SIZE))
+    if len(report) not in (rows * (width + 1), rows * (width + 1) - 1) \
+            or report[width::width + 1].count(LINE_END) != len(report) // (width + 1) \
+            or newlines != len(report) // (width + 1):
+        raise ValueError("binary numbers of the report must be of the same width")
+    return report
+
+################################################################################
+
+def parse_input(path: str = None) -> Union[bytes, Any]:
+    """
+    :param path: input file path, the day input by default
+    :return: binary numbers from the diagnostic report; the report text, lines of
+    the same width
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, _read_report)
+
+################################################################################
+
+def report_width(report: bytes) -> int:
+    """
+    :param report: binary numbers from the diagnostic report (see parse_input)
+    :return: number of bits of the binary numbers
+    """
+
+    width = report.find(LINE_END)
+    # a single number may not be ended by a newline
+    return len(report) if width < 0 else width
+
+################################################################################
+
+def report_rows(report: bytes) -> int:
+    """
+    :param report: binary numbers from the diagnostic report (see parse_input)
+    :return: number of the binary numbers; the last one may not be ended by a
+    newline
+    """
+
+    return (len(report) + len(LINE_END)) // (report_width(report) + len(LINE_END))
+
+################################################################################
+
+def _character_matrix(report: bytes) -> Any:
+    """
+    :param report: binary numbers from the diagnostic report (see parse_input)
+    :return: NumPy matrix of the characters of the binary numbers, a row per
+    number; a view of the report skipping the newlines, no copy is made
+    """
+
+    np = numpy()
+    width = report_width(report)
+    characters = np.frombuffer(report, dtype=np.uint8)
+    return np.lib.stride_tricks.as_strided(characters, shape=(report_rows(report), width),
+                                           strides=(width + 1, 1), writeable=False)
+
+################################################################################
+
+def column_counts(report: bytes) -> List[int]:
+    """
+    Counts the one bits in each position of the binary numbers in a single
+    vectorised pass. With NumPy, the report is viewed as a matrix of its
+    characters (no copy is made) and its columns are summed; otherwise each
+    column is sliced out of the report as a whole and its ones are counted. Any
+    bytes-like report works, so a memory-mapped report file can be counted
+    without being read into memory.
+
+    :param report: binary numbers from the diagnostic report (see parse_input)
+    :return: number of one bits in each position, from the most significant bit
+    """
+
+    width = report_width(report)
+    if width == 0:
+        return []
+
+    if has_numpy():
+        np = numpy()
+        sums = _character_matrix(report).sum(axis=0, dtype=np.int64) - ord("0") * report_rows(report)
+        return [int(count) for count in sums]
+
+    return [report[i::width + 1].count(b"1") for i in range(width)]
+
+################################################################################
+
+def sorted_numbers(report: bytes) -> Sequence[int]:
+    """
+    :param report: binary numbers from the diagnostic report (see parse_input)
+    :return: the binary numbers as integers, sorted; a NumPy array if NumPy is
+    installed and the numbers fit in it, a list otherwise
+    """
+
+    width = report_width(report)
+    if width == 0:
+        return []
+    if has_numpy() and width <= NUMPY_MAX_WIDTH:
+        np = numpy()
+        characters = _character_matrix(report)
+        numbers = np.zeros(len(characters), dtype=np.uint64)
+        for i in range(width):
+            numbers <<= np.uint64(1)
+            numbers |= characters[:, i] == ord("1")
+        numbers.sort()
+        return numbers
+
+    return sorted(int(report[start:start + width], base=2) for start in range(0, len(report), width + 1))
+
+################################################################################
+
+def find_rating(numbers: Sequence[int], width: int, most_common: bool) -> int:
+    """
+    Finds the rating by the bit criteria in the sorted numbers. The numbers
+    left after each step share all the bits considered so far, so they are a
+    contiguous range of the sorted numbers; those with a zero in the current
+    position come first and the range is split by a binary search for the
+    smallest possible number with a one there. No numbers are copied, the whole
+    search takes O(width log n).
+
+    If all the numbers left have the same bit in the current position, they are
+    all kept (the criteria would discard all of them otherwise).
+
+    :param numbers: sorted binary numbers from the diagnostic report
+    :param width: number of bits of the binary numbers
+    :param most_common: True to keep the numbers with the most common bit (1 if
+    both are equally common; oxygen generator rating), False to keep those with
+    the least common bit (0 if both are equally common; CO2 scrubber rating)
+    :return: the last number left
+    """
+
+    low = 0
+    high = len(numbers)
+    for bit in range(width - 1, -1, -1):
+        if high - low <= 1:
+            break
+        prefix = int(numbers[low]) >> (bit + 1) << (bit + 1)
+        split = bisect_left(numbers, prefix | (1 << bit), low, high)
+        zero_count = split - low
+        one_count = high - split
+        if zero_count == 0 or one_count == 0:
+            continue
+        if (one_count >= zero_count) == most_common:
+            low = split
+        else:
+            high = split
+
+    return int(numbers[low])
+
+################################################################################
+
+class DiagnosticIndex(object):
+    # the root is never a child, so its index marks a missing child
+    NO_CHILD = 0
+
+################################################################################
+
+    def __init__(self, report: bytes):
+        """
+        Binary trie of the binary numbers, built once to answer many bit
+        criteria queries; each one takes O(width). The nodes are stored in flat
+        arrays: the children of node i are at 2i (bit 0) and 2i + 1 (bit 1) of
+        the children array, the number of binary numbers under it at i of the
+        counts array.
+
+        :param report: binary numbers from the diagnostic report (see
+        parse_input)
+        """
+
+        super().__init__()
+
+        self._width = report_width(report)
+        self._children = array("l", [self.NO_CHILD, self.NO_CHILD])
+        self._counts = array("l", [0])
+        if self._width > 0:
+            for start in range(0, len(report), self._width + 1):
+                self._insert(report[start:start + self._width])
+
+################################################################################
+
+    def __len__(self) -> int:
+        """
+        :return: number of binary numbers in the index
+        """
+
+        return self._counts[0]
+
+################################################################################
+
+    @property
+    def width(self) -> int:
+        """
+        :return: number of bits of the binary numbers
+        """
+
+        return self._width
+
+################################################################################
+
+    def _insert(self, line: bytes) -> None:
+        """
+        :param line: binary number from the report
+        """
+
+        children = self._children
+        counts = self._counts
+        node = 0
+        counts[node] += 1
+        for character in line:
+            slot = 2 * node + (character == ord("1"))
+            if children[slot] == self.NO_CHILD:
+                children[slot] = len(counts)
+                children.extend((self.NO_CHILD, self.NO_CHILD))
+                counts.append(0)
+            node = children[slot]
+            counts[node] += 1
+
+################################################################################
+
+    def _find(self, prefix: str) -> Union[int, None]:
+        """
+        :param prefix: leading bits, e.g. "101"
+        :return: node of the prefix, None if no binary number starts with it
+        """
+
+        node = 0
+        for bit in prefix:
+            if bit not in ("0", "1"):
+                raise ValueError("prefix must be made of bits, not %r" % prefix)
+            node = self._children[2 * node + (bit == "1")]
+            if node == self.NO_CHILD:
+                return None
+
+        return node
+
+################################################################################
+
+    def _child_counts(self, node: int) -> Tuple[int, int]:
+        """
+        :param node: node of the trie
+        :return: numbers of the binary numbers under the node with 0 and 1 in
+        the next position
+        """
+
+        zero_child = self._children[2 * node]
+        one_child = self._children[2 * node + 1]
+        return self._counts[zero_child] if zero_child != self.NO_CHILD else 0, \
+            self._counts[one_child] if one_child != self.NO_CHILD else 0
+
+################################################################################
+
+    def count(self, prefix: str = "") -> int:
+        """
+        :param prefix: leading bits, e.g. "101"
+        :return: number of binary numbers starting with the prefix
+        """
+
+        node = self._find(prefix)
+        return 0 if node is None else self._counts[node]
+
+################################################################################
+
+    def majority(self, prefix: str = "", most_common: bool = True, tie: int = 1) -> Union[int, None]:
+        """
+        :param prefix: leading bits, e.g. "101"
+        :param most_common: True for the most common bit, False for the least
+        common one
+        :param tie: bit chosen if both are equally common
+        :return: the most (least) common bit right after the prefix among the
+        binary numbers starting with it; None if there are no such numbers or
+        the prefix is as wide as them
+        """
+
+        node = self._find(prefix)
+        if node is None or len(prefix) >= self._width:
+            return None
+
+        zero_count, one_count = self._child_counts(node)
+        if zero_count == one_count:
+            return tie
+        return int((one_count > zero_count) == most_common)
+
+################################################################################
+
+    def rating(self, most_common: bool = True, tie: int = None) -> Union[int, None]:
+        """
+        Finds the rating by the bit criteria (see find_rating), walking down the
+        trie. If all the numbers left have the same bit in the current position,
+        they are all kept.
+
+        :param most_common: True to keep the numbers with the most common bit
+        (oxygen generator rating), False to keep those with the least common bit
+        (CO2 scrubber rating)
+        :param tie: bit kept if both are equally common; by default 1 for the
+        most common and 0 for the least common bit, as in the puzzle
+        :return: the last number left, None if the index is empty
+        """
+
+        if len(self) == 0:
+            return None
+        if tie is None:
+            tie = 1 if most_common else 0
+
+        node = 0
+        rating = 0
+        for _ in range(self._width):
+            zero_count, one_count = self._child_counts(node)
+            if zero_count == 0:
+                bit = 1
+            elif one_count == 0:
+                bit = 0
+            elif zero_count == one_count:
+                bit = tie
+            else:
+                bit = int((one_count > zero_count) == most_common)
+            rating = (rating << 1) | bit
+            node = self._children[2 * node + bit]
+
+        return rating
+
+################################################################################
+
+def _report_blocks(path: str, memory_budget: int) -> Iterator[bytes]:
+    """
+    :param path: input file path
+    :param memory_budget: memory that may be used, in bytes; the blocks take
+    only a part of it, to leave room for processing them
+    :return: the diagnostic report read block by block; each block is made of
+    whole lines, in the same form as the parsed report (see parse_input)
+    """
+
+    with open(path, "rb") as f:
+        block_size = max(1, memory_budget // BLOCK_BUDGET_SHARE)
+        rest = b""
+        while True:
+            data = f.read(block_size)
+            block = rest + data
+            rest = b""
+            if len(data) > 0:
+                # the last line may go on in the next block
+                end = block.rfind(LINE_END) + 1
+                block, rest = block[:end], block[end:]
+            elif len(block) == 0:
+                break
+            # copied only if not in the right form already
+            if b"\r" in block or LINE_END * 2 in block or block[:1].isspace() or not block.endswith(LINE_END):
+                block = LINE_END.join(block.split()) + LINE_END
+            if len(block) > len(LINE_END):
+                yield block
+
+################################################################################
+
+def _bucket_counts(path: str, prefix: bytes, bits: int, memory_budget: int) -> List[int]:
+    """
+    :param path: input file path
+    :param prefix: leading bits of the binary numbers to count
+    :param bits: number of bits after the prefix the numbers are bucketed by
+    :param memory_budget: memory that may be used, in bytes
+    :return: number of the binary numbers starting with the prefix, for each
+    value of the following bits
+    """
+
+    counts = [0] * (1 << bits)
+    depth = len(prefix)
+    for block in _report_blocks(path, memory_budget):
+        if has_numpy():
+            np = numpy()
+            width = report_width(block)
+            characters = np.frombuffer(block, dtype=np.uint8).reshape(-1, width + 1)
+            if depth > 0:
+                characters = characters[(characters[:, :depth] == np.frombuffer(prefix, dtype=np.uint8)).all(axis=1)]
+            buckets = np.zeros(len(characters), dtype=np.int64)
+            for i in range(depth, depth + bits):
+                buckets <<= 1
+                buckets |= characters[:, i] == ord("1")
+            for bucket, count in enumerate(np.bincount(buckets, minlength=1 << bits)):
+                counts[bucket] += int(count)
+        else:
+            for line in block.split():
+                if line.startswith(prefix):
+                    counts[int(line[depth:depth + bits] or b"0", base=2)] += 1
+
+    return counts
+
+################################################################################
+
+def _filter_report(path: str, prefix: bytes, memory_budget: int) -> Iterator[bytes]:
+    """
+    :param path: input file path
+    :param prefix: leading bits of the binary numbers to keep
+    :param memory_budget: memory that may be used, in bytes
+    :return: blocks of the binary numbers starting with the prefix, in the same
+    form as the parsed report (see parse_input)
+    """
+
+    depth = len(prefix)
+    for block in _report_blocks(path, memory_budget):
+        if has_numpy():
+            np = numpy()
+            characters = np.frombuffer(block, dtype=np.uint8).reshape(-1, report_width(block) + 1)
+            block = characters[(characters[:, :depth] == np.frombuffer(prefix, dtype=np.uint8)).all(axis=1)].tobytes()
+        else:
+            block = b"".join(line + LINE_END for line in block.split() if line.startswith(prefix))
+        if len(block) > 0:
+            yield block
+
+################################################################################
+
+def find_rating_out_of_core(path: str, most_common: bool, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> int:
+    """
+    Finds the rating by the bit criteria (see find_rating) in a report that
+    may not fit in memory. Each pass over the numbers left counts them in
+    buckets by the next bits after the prefix they share; the bit criteria
+    steps are then decided from the bucket counts alone, each step halving the
+    range of buckets. Only the numbers of the surviving bucket are read again;
+    they are written to a temporary file and the search goes on there, until
+    they fit in the memory budget and the search is finished in memory.
+
+    :param path: input file path
+    :param most_common: True for the oxygen generator rating, False for the CO2
+    scrubber rating
+    :param memory_budget: memory that may be used, in bytes
+    :return: the last number left
+    """
+
+    width = report_width(next(_report_blocks(path, memory_budget), b""))
+    # the bucket counts take at most a quarter of the budget
+    max_bits = max(1, min(MAX_BUCKET_BITS, (memory_budget // 4 // 64).bit_length() - 1))
+
+    with TemporaryDirectory() as directory:
+        source = path
+        prefix = b""
+        while True:
+            bits = min(max_bits, width - len(prefix))
+            counts = list(accumulate(_bucket_counts(source, prefix, bits, memory_budget), initial=0))
+            low = 0
+            high = 1 << bits
+            for _ in range(bits):
+                if counts[high] - counts[low] <= 1:
+                    break
+                middle = (low + high) // 2
+                zero_count = counts[middle] - counts[low]
+                one_count = counts[high] - counts[middle]
+                if zero_count == 0 or ((one_count >= zero_count) == most_common and one_count > 0):
+                    low = middle
+                else:
+                    high = middle
+            # the bits decided so far are the same for all the buckets left
+            decided = (bits - (high - low).bit_length() + 1)
+            if decided > 0:
+                prefix += format(low >> (bits - decided), "0%db" % decided).encode()
+            left = counts[high] - counts[low]
+
+            if left * (width + 1 + IN_MEMORY_NUMBER_SIZE) <= memory_budget or len(prefix) == width:
+                report = b"".join(_filter_report(source, prefix, memory_budget))
+                return find_rating(sorted_numbers(report), width, most_common)
+
+            bucket_path = join(directory, "bucket_%d.txt" % len(prefix))
+            with open(bucket_path, "wb") as f:
+                for block in _filter_report(source, prefix, memory_budget):
+                    f.write(block)
+            source = bucket_path
+
+################################################################################
+
+def _power_consumption(counts: List[int], rows: int) -> int:
+    """
+    :param counts: number of one bits in each position (see column_counts)
+    :param rows: number of binary numbers
+    :return: power consumption of the submarine
+    """
+
+    # the most common bit (0 if both are equally common) of each position
+    gamma_rate = int("".join("1" if one_count > rows - one_count else "0" for one_count in counts) or "0", base=2)
+    # the least common bit (0 if both are equally common) of each position
+    epsilon_rate = int("".join("1" if one_count < rows - one_count else "0" for one_count in counts) or "0", base=2)
+    return gamma_rate * epsilon_rate
+
+################################################################################
+
+def power_consumption_out_of_core(path: str, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> int:
+    """
+    :param path: input file path; the report is streamed block by block, it
+    does not have to fit in memory
+    :param memory_budget: memory that may be used, in bytes
+    :return: power consumption of the submarine
+    """
+
+    counts = []
+    rows = 0
+    for block in _report_blocks(path, memory_budget):
+        counts = [total + count for total, count in zip(counts, column_counts(block))] \
+            if rows > 0 else column_counts(block)
+        rows += len(block) // (report_width(block) + 1)
+
+    return _power_consumption(counts, rows)
+
+################################################################################
+
+def life_support_rating_out_of_core(path: str, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> int:
+    """
+    :param path: input file path; the report does not have to fit in memory
+    :param memory_budget: memory that may be used, in bytes
+    :return: life support rating of the submarine
+    """
+
+    return find_rating_out_of_core(path, True, memory_budget) \
+        * find_rating_out_of_core(path, False, memory_budget)
+
+################################################################################
+
+def solve_1(data: Union[bytes, str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: power consumption of the submarine
+    """
+
+    report = parse_input(data) if isinstance(data, str) else data
+    return _power_consumption(column_counts(report), report_rows(report))
 
 ################################################################################
 
@@ -72,22 +632,24 @@ def puzzle_1() -> None:
     of the submarine? (Be sure to represent your answer in decimal, not binary.)
     """
 
-    gamma_rate = ""
-    epsilon_rate = ""
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        numbers = [number.strip() for number in f.readlines()]
-        for i in range(len(numbers[0])):
-            zero_count = [number[i] for number in numbers].count("0")
-            one_count = [number[i] for number in numbers].count("1")
-            gamma_rate += "0" if max(zero_count, one_count) == zero_count else "1"
-            epsilon_rate += "0" if min(zero_count, one_count) == zero_count else "1"
+    # should be 841526
+    print(solve_1(parse_input()))
 
-    gamma_rate = int(gamma_rate, base=2)
-    epsilon_rate = int(epsilon_rate, base=2)
-    power_consumption = gamma_rate * epsilon_rate
+################################################################################
 
-    # should be 841526
-    print(power_consumption)
+def solve_2(data: Union[bytes, str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: life support rating of the submarine
+    """
+
+    report = parse_input(data) if isinstance(data, str) else data
+    numbers = sorted_numbers(report)
+    oxygen_generator_rating = find_rating(numbers, report_width(report), True)
+    co2_scrubber_rating = find_rating(numbers, report_width(report), False)
+    life_support_rating = oxygen_generator_rating * co2_scrubber_rating
+
+    return life_support_rating
 
 ################################################################################
 
@@ -168,38 +730,36 @@ def puzzle_2() -> None:
     answer in decimal, not binary.)
     """
 
-    # oxygen generator raging
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        numbers = [number.strip() for number in f.readlines()]
-        i = 0
-        while len(numbers) > 1:
-            zero_count = len([number[i] for number in numbers if number[i] == "0"])
-            one_count = len([number[i] for number in numbers if number[i] == "1"])
-            if zero_count > one_count:
-                numbers = tuple(filter(lambda number: number[i] == "0", numbers))
-            else:
-                numbers = tuple(filter(lambda number: number[i] == "1", numbers))
-            i += 1
-
-    oxygen_generator_rating = int(numbers[0], base=2)
-
-    # CO2 scrubber rating
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        numbers = [number.strip() for number in f.readlines()]
-        i = 0
-        while len(numbers) > 1:
-            zero_count = len([number[i] for number in numbers if number[i] == "0"])
-            one_count = len([number[i] for number in numbers if number[i] == "1"])
-            if zero_count > one_count:
-                numbers = tuple(filter(lambda number: number[i] == "1", numbers))
-            else:
-                numbers = tuple(filter(lambda number: number[i] == "0", numbers))
-            i += 1
+    # should be 4790390
+    print(solve_2(parse_input()))
 
-    co2_scrubber_rating = int(numbers[0], base=2)
-    life_support_rating = oxygen_generator_rating * co2_scrubber_rating
+################################################################################
 
-    # should be 4790390
-    print(life_support_rating)
+def _life_support_rating_indexed(path: str) -> int:
+    """
+    :param path: input file path
+    :return: life support rating of the submarine, found in the trie of the
+    report (see DiagnosticIndex)
+    """
+
+    index = DiagnosticIndex(parse_input(path))
+    return index.rating(True) * index.rating(False)
+
+################################################################################
+
+# memory budget of the out-of-core engines checked by the regression harness;
+# small enough for the day input to be read in many blocks and filtered to
+# temporary files
+REGRESSION_MEMORY_BUDGET = 4 << 10
+# see common.regression.alternate_engines
+REGRESSION_ENGINES = {
+    1: {
+        "out_of_core": lambda path: power_consumption_out_of_core(path, REGRESSION_MEMORY_BUDGET)
+    },
+    2: {
+        "out_of_core": lambda path: life_support_rating_out_of_core(path, REGRESSION_MEMORY_BUDGET),
+        "index": _life_support_rating_indexed
+    }
+}
 
 ################################################################################
\ No newline at end of file
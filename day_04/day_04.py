@@ -1,9 +1,13 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
-from re import compile
+from array import array
+from os import cpu_count
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+from common.input_loader import CHUNKS_PER_WORKER, binary_cached, input_path, load_parsed, read_lines
+from common.instrumentation import PHASE_CORE, phase
+from common.optional import has_numpy, numpy
 
 """
 --- Day 4: Giant Squid ---
@@ -18,8 +22,264 @@ Maybe it wants to play bingo?
 ################################################################################
 
 SELF_DIR_NAME = "day_04"
-INPUT_TXT_NAME = "input.txt"
 BOARD_LENGTH = 5
+BOARD_SIZE = BOARD_LENGTH ** 2
+# boards numbers are stored as short integers, 2 bytes per cell
+CELL_TYPECODE = "h"
+# boards whose win turns are computed at once, bounds the temporary arrays
+BOARDS_CHUNK_SIZE = 1 << 16
+
+# boards numbers shared with this worker process and the shared memory with them
+_shared_cells: Union[memoryview, None] = None
+_shared_memory = None
+
+################################################################################
+
+@binary_cached("boards", lambda bingo: bingo, lambda arrays: arrays)
+def _parse_bingo(path: str) -> Tuple[array, array]:
+    """
+    :param path: input file path
+    :return: the drawn numbers and all the boards numbers (row by row, board by
+    board) as flat arrays of short integers
+    """
+
+    lines = read_lines(path)
+    numbers = array(CELL_TYPECODE, (int(number) for number in lines[0].split(",")))
+    cells = array(CELL_TYPECODE, (int(number) for line in lines[1:] for number in line.split()))
+    if len(cells) % BOARD_SIZE != 0:
+        raise ValueError("incomplete board, %d numbers left over" % (len(cells) % BOARD_SIZE))
+    return numbers, cells
+
+################################################################################
+
+def parse_input(path: str = None) -> Tuple[Sequence[int], Sequence[int]]:
+    """
+    :param path: input file path, the day input by default
+    :return: the drawn numbers and all the boards numbers (row by row, board by
+    board, BOARD_SIZE numbers each)
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, _parse_bingo)
+
+################################################################################
+
+class Bingo(object):
+
+################################################################################
+
+    def __init__(self, cells: Sequence[int]):
+        """
+        Bingo played on the boards. Every number is indexed once with all the
+        cells it is in, and every row and column of each board counts its cells
+        left unmarked; so a draw touches only the cells it marks and a board
+        wins once one of its counters gets to zero. All the state is kept in
+        flat arrays, a few bytes per board.
+
+        :param cells: all the boards numbers (row by row, board by board)
+        """
+
+        super().__init__()
+
+        boards_count = len(cells) // BOARD_SIZE
+        # number: indices of the cells with it, ordered by the board
+        self._cells: Dict[int, array] = {}
+        for index, number in enumerate(cells):
+            indices = self._cells.get(number)
+            if indices is None:
+                indices = self._cells[number] = array("i")
+            indices.append(index)
+
+        # unmarked cells of all the rows (columns), board by board
+        self._rows_left = bytearray((BOARD_LENGTH,)) * (boards_count * BOARD_LENGTH)
+        self._columns_left = bytearray((BOARD_LENGTH,)) * (boards_count * BOARD_LENGTH)
+        self._unmarked_sums = array("q", (sum(cells[i:i + BOARD_SIZE])
+                                          for i in range(0, boards_count * BOARD_SIZE, BOARD_SIZE)))
+        self._won = bytearray(boards_count)
+
+################################################################################
+
+    def draw(self, number: int) -> List[int]:
+        """
+        Marks the number on all the boards that have not won yet.
+
+        :param number: drawn number
+        :return: boards that win by this number, in order
+        """
+
+        won_now = []
+        # a number drawn again has nothing left to mark
+        for index in self._cells.pop(number, ()):
+            board = index // BOARD_SIZE
+            if self._won[board]:
+                continue
+            self._unmarked_sums[board] -= number
+            row_index = index // BOARD_LENGTH
+            column_index = board * BOARD_LENGTH + index % BOARD_LENGTH
+            self._rows_left[row_index] -= 1
+            self._columns_left[column_index] -= 1
+            if self._rows_left[row_index] == 0 or self._columns_left[column_index] == 0:
+                won_now.append(board)
+
+        # the board may have had the number more than once
+        winners = []
+        for board in won_now:
+            if not self._won[board]:
+                self._won[board] = True
+                winners.append(board)
+        return winners
+
+################################################################################
+
+    def play(self, numbers: Sequence[int]) -> Iterator[Tuple[int, int]]:
+        """
+        :param numbers: the drawn numbers, in order
+        :return: the boards in the order they win (boards winning by the same
+        number ordered by their index) and their final scores; the sum of the
+        unmarked numbers of the board multiplied by the number that made it win
+        """
+
+        for number in numbers:
+            for board in self.draw(number):
+                yield board, self._unmarked_sums[board] * number
+
+################################################################################
+
+def win_scores(numbers: Sequence[int], cells: Sequence[int]) -> Tuple[Union[int, None], Union[int, None]]:
+    """
+    Finds the first and the last winning board without playing. Each number is
+    mapped to its draw turn; a line of a board is complete at the latest turn of
+    its numbers and the board wins at the earliest turn its lines are complete.
+    That is computed with NumPy for all the boards at once, as the minimum over
+    the rows and the columns of the maximum over their cells of a (boards, 5, 5)
+    tensor of the turns.
+
+    :param numbers: the drawn numbers, in order
+    :param cells: all the boards numbers (row by row, board by board)
+    :return: final score of the board that wins first (the lowest index one if
+    more boards win at the same turn) and of the board that wins last (the
+    highest index one if more boards win at the same turn); None if no board
+    wins
+    """
+
+    np = numpy()
+    numbers = np.asarray(numbers, dtype=np.int64)
+    cells = np.asarray(cells).reshape(-1, BOARD_LENGTH, BOARD_LENGTH)
+    if len(cells) == 0 or len(numbers) == 0:
+        return None, None
+
+    # turn of each number, a number is marked when it is drawn for the first
+    # time; numbers never drawn get a turn after all the draws
+    never = len(numbers)
+    turns = np.full(max(int(numbers.max()), int(cells.max())) + 1, never, dtype=np.int32)
+    drawn, first_turns = np.unique(numbers, return_index=True)
+    turns[drawn] = first_turns
+
+    win_turns = np.empty(len(cells), dtype=np.int32)
+    for start in range(0, len(cells), BOARDS_CHUNK_SIZE):
+        board_turns = turns[cells[start:start + BOARDS_CHUNK_SIZE]]
+        win_turns[start:start + BOARDS_CHUNK_SIZE] = np.minimum(
+            board_turns.max(axis=2).min(axis=1), board_turns.max(axis=1).min(axis=1))
+
+    def score(board: int) -> Union[int, None]:
+        turn = win_turns[board]
+        if turn == never:
+            return None
+        unmarked = cells[board][turns[cells[board]] > turn]
+        return int(unmarked.sum(dtype=np.int64)) * int(numbers[turn])
+
+    first = int(np.argmin(win_turns))
+    # boards that never win do not count, the highest index wins the ties
+    last_turns = np.where(win_turns == never, -1, win_turns)
+    last = len(cells) - 1 - int(np.argmax(last_turns[::-1]))
+    return score(first), score(last)
+
+################################################################################
+
+def _attach_cells(name: str, count: int) -> None:
+    """
+    Pool initializer; attaches the worker process to the shared memory with
+    the boards numbers, once for all its tasks.
+
+    :param name: name of the shared memory block
+    :param count: number of the boards numbers in it
+    """
+
+    from multiprocessing.shared_memory import SharedMemory
+
+    global _shared_cells, _shared_memory
+    _shared_memory = SharedMemory(name=name)
+    _shared_cells = _shared_memory.buf[:count * array(CELL_TYPECODE).itemsize].cast(CELL_TYPECODE)
+
+################################################################################
+
+def _score_shared(numbers: Sequence[int]) -> Tuple[Union[int, None], Union[int, None]]:
+    """
+    :param numbers: the drawn numbers, in order
+    :return: final scores of the first and the last winning board of the
+    shared boards (see win_scores)
+    """
+
+    if has_numpy():
+        return win_scores(numbers, _shared_cells)
+
+    scores = [score for _, score in Bingo(_shared_cells).play(numbers)]
+    return (scores[0], scores[-1]) if len(scores) > 0 else (None, None)
+
+################################################################################
+
+def score_draws(cells: Sequence[int], draws: Sequence[Sequence[int]],
+                workers: int = None) -> List[Tuple[Union[int, None], Union[int, None]]]:
+    """
+    Plays many independent games on the same boards in a pool of worker
+    processes, one game per sequence of drawn numbers. The boards numbers are
+    copied once into shared memory that the workers attach to when they start,
+    so only the drawn numbers are sent with the tasks.
+
+    :param cells: all the boards numbers (row by row, board by board)
+    :param draws: sequences of the drawn numbers, each of them a game of its own
+    :param workers: number of worker processes, one per CPU core by default
+    :return: final scores of the first and the last winning board of each game
+    (None if no board wins), in the order of the draws
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing.shared_memory import SharedMemory
+
+    if len(draws) == 0:
+        return []
+    if workers is None:
+        workers = cpu_count() or 1
+
+    cells = array(CELL_TYPECODE, cells)
+    # a shared memory block cannot be empty
+    memory = SharedMemory(create=True, size=max(1, len(cells) * cells.itemsize))
+    try:
+        memory.buf[:len(cells) * cells.itemsize] = cells.tobytes()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_cells,
+                                 initargs=(memory.name, len(cells))) as executor:
+            return list(executor.map(_score_shared, draws,
+                                     chunksize=max(1, len(draws) // (workers * CHUNKS_PER_WORKER))))
+    finally:
+        memory.close()
+        memory.unlink()
+
+################################################################################
+
+def solve_1(data: Union[Tuple[Sequence[int], Sequence[int]], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: final score of the board that wins first
+    """
+
+    numbers, cells = parse_input(data) if isinstance(data, str) else data
+
+    with phase(PHASE_CORE):
+        if has_numpy():
+            return win_scores(numbers, cells)[0]
+
+        for _, score in Bingo(cells).play(numbers):
+            # first winning board found
+            return score
 
 ################################################################################
 
@@ -98,39 +358,28 @@ def puzzle_1() -> None:
     win first. What will your final score be if you choose that board?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        lines = f.readlines()
-        numbers = [int(number) for number in lines[0].strip().split(",")]
-        lines = lines[1:]
-        step = BOARD_LENGTH + 1
-        pattern = compile(r'\d+')
-        boards = [[[int(number) for number in pattern.findall(line.strip())]
-                   for line in lines[i + 1:i + step]]
-                  for i in range(0, len(lines), step)]
+    # should be 55770
+    print(solve_1(parse_input()))
 
-        for number in numbers:
-            for board_index in range(len(boards)):
-                board = boards[board_index]
-
-                for row in range(len(board)):
-                    for column in range(len(board[row])):
-                        if number == board[row][column]:
-                            # number was found in the board
-                            board[row][column] = None
-
-                for i in range(5):
-                    # check if any row or column consists only from marked numbers (None)
-                    if all([number is None for number in board[i]]) \
-                            or all([row[i] is None for row in board]):
-                        # first winning board found
-                        unmarked = sum(
-                            [board[i][j]
-                             for i in range(len(board))
-                             for j in range(len(board[i]))
-                             if board[i][j] is not None])
-                        # should be 55770
-                        print(unmarked * number)
-                        return
+################################################################################
+
+def solve_2(data: Union[Tuple[Sequence[int], Sequence[int]], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: final score of the board that wins last
+    """
+
+    numbers, cells = parse_input(data) if isinstance(data, str) else data
+    last_score = None
+
+    with phase(PHASE_CORE):
+        if has_numpy():
+            return win_scores(numbers, cells)[1]
+
+        for _, score in Bingo(cells).play(numbers):
+            last_score = score
+
+    return last_score
 
 ################################################################################
 
@@ -155,46 +404,50 @@ def puzzle_2() -> None:
     score be?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        lines = f.readlines()
-        numbers = [int(number) for number in lines[0].strip().split(",")]
-        lines = lines[1:]
-        step = BOARD_LENGTH + 1
-        pattern = compile(r'\d+')
-        boards = [[[int(number) for number in pattern.findall(line.strip())]
-                   for line in lines[i + 1:i + step]]
-                  for i in range(0, len(lines), step)]
-        winning_boards = []
+    # should be 2980
+    print(solve_2(parse_input()))
 
-        for number in numbers:
-            for board_index in range(len(boards)):
-                if board_index not in winning_boards:
-                    # play with boards that haven't already won
-                    board = boards[board_index]
-
-                    for row in range(len(board)):
-                        for column in range(len(board[row])):
-                            if number == board[row][column]:
-                                # number was found in the board
-                                board[row][column] = None
-
-                    for i in range(5):
-                        # check if any row or column consists only from marked numbers (None)
-                        if all([number is None for number in board[i]]) \
-                                or all([row[i] is None for row in board]):
-                            # this board wins
-                            winning_boards.append(board_index)
-
-                            if len(winning_boards) == len(boards):
-                                # last winning board found
-                                unmarked = sum(
-                                    [board[i][j]
-                                     for i in range(len(board))
-                                     for j in range(len(board[i]))
-                                     if board[i][j] is not None])
-                                # should be 2980
-                                print(unmarked * number)
-                                return
-                            break
+################################################################################
+
+def _score_played(path: str, part: int) -> Union[int, None]:
+    """
+    :param path: input file path
+    :param part: puzzle number (1 or 2)
+    :return: final score of the board that wins first (last), played number by
+    number (see Bingo)
+    """
+
+    numbers, cells = parse_input(path)
+    scores = [score for _, score in Bingo(cells).play(numbers)]
+    if len(scores) == 0:
+        return None
+    return scores[0] if part == 1 else scores[-1]
+
+################################################################################
+
+def _score_batched(path: str, part: int) -> Union[int, None]:
+    """
+    :param path: input file path
+    :param part: puzzle number (1 or 2)
+    :return: final score of the board that wins first (last), scored as a batch
+    of a single game (see score_draws)
+    """
+
+    numbers, cells = parse_input(path)
+    return score_draws(cells, [numbers], workers=2)[0][part - 1]
+
+################################################################################
+
+# see common.regression.alternate_engines
+REGRESSION_ENGINES = {
+    1: {
+        "bingo": lambda path: _score_played(path, 1),
+        "batch": lambda path: _score_batched(path, 1)
+    },
+    2: {
+        "bingo": lambda path: _score_played(path, 2),
+        "batch": lambda path: _score_batched(path, 2)
+    }
+}
 
 ################################################################################
\ No newline at end of file
@@ -1,9 +1,12 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
+from array import array
 from re import compile
+from typing import Dict, Tuple, Union
+
+from common.input_loader import binary_cached, input_path, load_parsed, read_lines
+from common.instrumentation import PHASE_CORE, PHASE_REDUCE, phase
 
 """
 --- Day 5: Hydrothermal Venture ---
@@ -16,11 +19,92 @@ possible.
 ################################################################################
 
 SELF_DIR_NAME = "day_05"
-INPUT_TXT_NAME = "input.txt"
 X1_KEY = "X1"
 X2_KEY = "X2"
 Y1_KEY = "Y1"
 Y2_KEY = "Y2"
+# order of the coordinates in the input
+COORDINATES_KEYS = (X1_KEY, Y1_KEY, X2_KEY, Y2_KEY)
+
+################################################################################
+
+def _encode_lines(lines: Tuple[Dict[str, int], ...]) -> Tuple[array, ...]:
+    """
+    :param lines: lines of vents
+    :return: end points coordinates of all the lines (x1, y1, x2, y2 of each)
+    as a flat array
+    """
+
+    return array("q", (line[key] for line in lines for key in COORDINATES_KEYS)),
+
+################################################################################
+
+def _decode_lines(arrays: Tuple[memoryview, ...]) -> Tuple[Dict[str, int], ...]:
+    """
+    :param arrays: end points coordinates of all the lines
+    :return: lines of vents; their end points coordinates
+    """
+
+    coordinates = arrays[0]
+    step = len(COORDINATES_KEYS)
+    return tuple(dict(zip(COORDINATES_KEYS, coordinates[i:i + step]))
+                 for i in range(0, len(coordinates), step))
+
+################################################################################
+
+@binary_cached("lines", _encode_lines, _decode_lines)
+def _parse_lines(path: str) -> Tuple[Dict[str, int], ...]:
+    """
+    :param path: input file path
+    :return: lines of vents; their end points coordinates
+    """
+
+    pattern = compile(r'\d+')
+    return tuple(dict(zip(COORDINATES_KEYS, map(int, pattern.findall(line))))
+                 for line in read_lines(path))
+
+################################################################################
+
+def parse_input(path: str = None) -> Tuple[Dict[str, int], ...]:
+    """
+    :param path: input file path, the day input by default
+    :return: lines of vents; their end points coordinates
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, _parse_lines)
+
+################################################################################
+
+def solve_1(data: Union[Tuple[Dict[str, int], ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: number of points where at least two horizontal or vertical lines
+    overlap
+    """
+
+    lines = parse_input(data) if isinstance(data, str) else data
+
+    # filter only horizontal and vertical lines out
+    horizontal = tuple(filter(lambda line: line[Y1_KEY] == line[Y2_KEY], lines))
+    vertical = tuple(filter(lambda line: line[X1_KEY] == line[X2_KEY], lines))
+
+    # figure out the diagram size and create the diagram
+    width = max([max(line[X1_KEY], line[X2_KEY]) for line in horizontal + vertical])
+    height = max([max(line[Y1_KEY], line[Y2_KEY]) for line in horizontal + vertical])
+    diagram = list([list([0 for _ in range(width + 1)]) for _ in range(height + 1)])
+
+    # put all the horizontal and vertical lines in the diagram
+    with phase(PHASE_CORE):
+        for line in horizontal:
+            for x in range(min(line[X1_KEY], line[X2_KEY]), max(line[X1_KEY], line[X2_KEY]) + 1):
+                diagram[line[Y1_KEY]][x] += 1
+
+        for line in vertical:
+            for y in range(min(line[Y1_KEY], line[Y2_KEY]), max(line[Y1_KEY], line[Y2_KEY]) + 1):
+                diagram[y][line[X1_KEY]] += 1
+
+    with phase(PHASE_REDUCE):
+        return sum([sum([1 for number in row if number >= 2]) for row in diagram])
 
 ################################################################################
 
@@ -81,25 +165,31 @@ def puzzle_1() -> None:
     two lines overlap?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        pattern = compile(r'\d+')
-        lines = [{
-            X1_KEY: int(pattern.findall(line)[0]),
-            Y1_KEY: int(pattern.findall(line)[1]),
-            X2_KEY: int(pattern.findall(line)[2]),
-            Y2_KEY: int(pattern.findall(line)[3])
-        } for line in f.readlines()]
+    # should be 8111
+    print(solve_1(parse_input()))
 
-        # filter only horizontal and vertical lines out
-        horizontal = tuple(filter(lambda line: line[Y1_KEY] == line[Y2_KEY], lines))
-        vertical = tuple(filter(lambda line: line[X1_KEY] == line[X2_KEY], lines))
+################################################################################
 
-        # figure out the diagram size and create the diagram
-        width = max([max(line[X1_KEY], line[X2_KEY]) for line in horizontal + vertical])
-        height = max([max(line[Y1_KEY], line[Y2_KEY]) for line in horizontal + vertical])
-        diagram = list([list([0 for _ in range(width + 1)]) for _ in range(height + 1)])
+def solve_2(data: Union[Tuple[Dict[str, int], ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: number of points where at least two lines overlap
+    """
+
+    lines = parse_input(data) if isinstance(data, str) else data
 
-        # put all the horizontal and vertical lines in the diagram
+    # sort the lines to horizontal, vertical and diagonal
+    horizontal = tuple(filter(lambda line: line[Y1_KEY] == line[Y2_KEY], lines))
+    vertical = tuple(filter(lambda line: line[X1_KEY] == line[X2_KEY], lines))
+    diagonal = tuple(filter(lambda line: line not in horizontal and line not in vertical, lines))
+
+    # figure out the diagram size and create the diagram
+    width = max([max(line[X1_KEY], line[X2_KEY]) for line in lines])
+    height = max([max(line[Y1_KEY], line[Y2_KEY]) for line in lines])
+    diagram = list([list([0 for _ in range(width + 1)]) for _ in range(height + 1)])
+
+    # put all the lines in the diagram
+    with phase(PHASE_CORE):
         for line in horizontal:
             for x in range(min(line[X1_KEY], line[X2_KEY]), max(line[X1_KEY], line[X2_KEY]) + 1):
                 diagram[line[Y1_KEY]][x] += 1
@@ -108,8 +198,21 @@ def puzzle_1() -> None:
             for y in range(min(line[Y1_KEY], line[Y2_KEY]), max(line[Y1_KEY], line[Y2_KEY]) + 1):
                 diagram[y][line[X1_KEY]] += 1
 
-    # should be 8111
-    print(sum([sum([1 for number in row if number >= 2]) for row in diagram]))
+        for line in diagonal:
+            if line[X1_KEY] < line[X2_KEY]:
+                x_coords = tuple(range(line[X1_KEY], line[X2_KEY] + 1))
+            else:
+                x_coords = tuple(reversed(range(line[X2_KEY], line[X1_KEY] + 1)))
+            if line[Y1_KEY] < line[Y2_KEY]:
+                y_coords = tuple(range(line[Y1_KEY], line[Y2_KEY] + 1))
+            else:
+                y_coords = tuple(reversed(range(line[Y2_KEY], line[Y1_KEY] + 1)))
+
+            for i in range(len(x_coords)):
+                diagram[y_coords[i]][x_coords[i]] += 1
+
+    with phase(PHASE_REDUCE):
+        return sum([sum([1 for number in row if number >= 2]) for row in diagram])
 
 ################################################################################
 
@@ -148,48 +251,7 @@ def puzzle_2() -> None:
     Consider all of the lines. At how many points do at least two lines overlap?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        pattern = compile(r'\d+')
-        lines = [{
-            X1_KEY: int(pattern.findall(line)[0]),
-            Y1_KEY: int(pattern.findall(line)[1]),
-            X2_KEY: int(pattern.findall(line)[2]),
-            Y2_KEY: int(pattern.findall(line)[3])
-        } for line in f.readlines()]
-
-        # sort the lines to horizontal, vertical and diagonal
-        horizontal = tuple(filter(lambda line: line[Y1_KEY] == line[Y2_KEY], lines))
-        vertical = tuple(filter(lambda line: line[X1_KEY] == line[X2_KEY], lines))
-        diagonal = tuple(filter(lambda line: line not in horizontal and line not in vertical, lines))
-
-        # figure out the diagram size and create the diagram
-        width = max([max(line[X1_KEY], line[X2_KEY]) for line in lines])
-        height = max([max(line[Y1_KEY], line[Y2_KEY]) for line in lines])
-        diagram = list([list([0 for _ in range(width + 1)]) for _ in range(height + 1)])
-
-        # put all the lines in the diagram
-        for line in horizontal:
-            for x in range(min(line[X1_KEY], line[X2_KEY]), max(line[X1_KEY], line[X2_KEY]) + 1):
-                diagram[line[Y1_KEY]][x] += 1
-
-        for line in vertical:
-            for y in range(min(line[Y1_KEY], line[Y2_KEY]), max(line[Y1_KEY], line[Y2_KEY]) + 1):
-                diagram[y][line[X1_KEY]] += 1
-
-        for line in diagonal:
-            if line[X1_KEY] < line[X2_KEY]:
-                x_coords = tuple(range(line[X1_KEY], line[X2_KEY] + 1))
-            else:
-                x_coords = tuple(reversed(range(line[X2_KEY], line[X1_KEY] + 1)))
-            if line[Y1_KEY] < line[Y2_KEY]:
-                y_coords = tuple(range(line[Y1_KEY], line[Y2_KEY] + 1))
-            else:
-                y_coords = tuple(reversed(range(line[Y2_KEY], line[Y1_KEY] + 1)))
-
-            for i in range(len(x_coords)):
-                diagram[y_coords[i]][x_coords[i]] += 1
-
     # should be 22088
-    print(sum([sum([1 for number in row if number >= 2]) for row in diagram]))
+    print(solve_2(parse_input()))
 
 ################################################################################
\ No newline at end of file
@@ -1,10 +1,12 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
-from re import compile
+from array import array
 from sys import maxsize
+from typing import Union
+
+from common.input_loader import input_path, load_parsed, read_ints
+from common.instrumentation import PHASE_CORE, phase
 
 """
 --- Day 7: The Treachery of Whales ---
@@ -21,7 +23,34 @@ beyond where they're aiming!
 ################################################################################
 
 SELF_DIR_NAME = "day_07"
-INPUT_TXT_NAME = "input.txt"
+
+################################################################################
+
+def parse_input(path: str = None) -> array:
+    """
+    :param path: input file path, the day input by default
+    :return: horizontal positions of the crabs
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, read_ints)
+
+################################################################################
+
+def solve_1(data: Union[array, str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: the least fuel the crabs must spend to align
+    """
+
+    positions = parse_input(data) if isinstance(data, str) else data
+    min_position = min(positions)
+    max_position = max(positions)
+    with phase(PHASE_CORE):
+        least_fuel = min([
+            sum([abs(alignment - position) for position in positions])
+            for alignment in range(min_position, max_position + 1)])
+
+    return least_fuel
 
 ################################################################################
 
@@ -72,17 +101,28 @@ def puzzle_1() -> None:
     position?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        pattern = compile(r'\d+')
-        positions = tuple(map(lambda position: int(position), pattern.findall(f.read())))
-        min_position = min(positions)
-        max_position = max(positions)
+    # should be 336721
+    print(solve_1(parse_input()))
+
+################################################################################
+
+def solve_2(data: Union[array, str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: the least fuel the crabs must spend to align, each step costs one
+    more fuel than the previous one
+    """
+
+    positions = parse_input(data) if isinstance(data, str) else data
+    min_position = min(positions)
+    max_position = max(positions)
+    with phase(PHASE_CORE):
         least_fuel = min([
-            sum([abs(alignment - position) for position in positions])
+            sum([sum(range(1, abs(alignment - position) + 1))
+                 for position in positions])
             for alignment in range(min_position, max_position + 1)])
 
-    # should be 336721
-    print(least_fuel)
+    return least_fuel
 
 ################################################################################
 
@@ -121,17 +161,7 @@ def puzzle_2() -> None:
     they spend to align to that position?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        pattern = compile(r'\d+')
-        positions = tuple(map(lambda position: int(position), pattern.findall(f.read())))
-        min_position = min(positions)
-        max_position = max(positions)
-        least_fuel = min([
-            sum([sum(range(1, abs(alignment - position) + 1))
-                 for position in positions])
-            for alignment in range(min_position, max_position + 1)])
-
     # should be 91638945
-    print(least_fuel)
+    print(solve_2(parse_input()))
 
 ################################################################################
\ No newline at end of file
@@ -1,8 +1,9 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
+from typing import Tuple, Union
+
+from common.input_loader import input_path, load_parsed, read_lines
 
 """
 --- Day 8: Seven Segment Search ---
@@ -20,11 +21,20 @@ them, so you'd better figure out what's wrong.
 ################################################################################
 
 SELF_DIR_NAME = "day_08"
-INPUT_TXT_NAME = "input.txt"
 SEPARATOR = "|"
 
 ################################################################################
 
+def parse_input(path: str = None) -> Tuple[str, ...]:
+    """
+    :param path: input file path, the day input by default
+    :return: entries; the unique signal patterns and the output values
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, read_lines)
+
+################################################################################
+
 def decode_entry(entry: str) -> int:
     """
     :param entry: consists of ten unique signal patterns, a | delimiter, and
@@ -130,6 +140,29 @@ def decode_entry(entry: str) -> int:
 
 ################################################################################
 
+def solve_1(data: Union[Tuple[str, ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: how many times digits 1, 4, 7 or 8 appear in the output values
+    """
+
+    patterns = parse_input(data) if isinstance(data, str) else data
+    output_values = tuple([pattern.split(SEPARATOR)[1].strip()
+                           for pattern in patterns])
+
+    digits_1478_count = sum([len([
+        value for value in output_value
+        if len(value) == 2
+           or len(value) == 4
+           or len(value) == 3
+           or len(value) == 7])
+        for output_value in map(
+            lambda output_values: output_values.split(" "), output_values)])
+
+    return digits_1478_count
+
+################################################################################
+
 def puzzle_1() -> None:
     """
     --- Part One ---
@@ -232,22 +265,19 @@ def puzzle_1() -> None:
     In the output values, how many times do digits 1, 4, 7, or 8 appear?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        patterns = tuple([line for line in f.readlines()])
-        output_values = tuple([pattern.split(SEPARATOR)[1].strip()
-                               for pattern in patterns])
+    # should be 261
+    print(solve_1(parse_input()))
+
+################################################################################
 
-        digits_1478_count = sum([len([
-            value for value in output_value
-            if len(value) == 2
-               or len(value) == 4
-               or len(value) == 3
-               or len(value) == 7])
-            for output_value in map(
-                lambda output_values: output_values.split(" "), output_values)])
+def solve_2(data: Union[Tuple[str, ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: sum of all the decoded output values
+    """
 
-    # should be 261
-    print(digits_1478_count)
+    entries = parse_input(data) if isinstance(data, str) else data
+    return sum([decode_entry(entry) for entry in entries])
 
 ################################################################################
 
@@ -315,9 +345,7 @@ def puzzle_2() -> None:
     values?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        entries = tuple([line.strip() for line in f.readlines()])
-        # should be 987553
-        print(sum([decode_entry(entry) for entry in entries]))
+    # should be 987553
+    print(solve_2(parse_input()))
 
 ################################################################################
\ No newline at end of file
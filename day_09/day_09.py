@@ -1,10 +1,12 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
+from array import array
 from sys import maxsize
-from typing import List, Dict, Tuple
+from typing import List, Dict, Sequence, Tuple, Union
+
+from common.input_loader import binary_cached, input_path, load_parsed, read_lines
+from common.instrumentation import PHASE_CORE, PHASE_REDUCE, phase, timed
 
 """
 --- Day 9: Smoke Basin ---
@@ -21,7 +23,53 @@ floor of the nearby caves for you (your puzzle input).
 ################################################################################
 
 SELF_DIR_NAME = "day_09"
-INPUT_TXT_NAME = "input.txt"
+
+################################################################################
+
+def _encode_heightmap(heightmap: Tuple[Sequence[int], ...]) -> Tuple[array, ...]:
+    """
+    :param heightmap: heights of the floor locations
+    :return: the row length and the heights (row by row) as flat arrays
+    """
+
+    return array("q", [len(heightmap[0]) if len(heightmap) > 0 else 0]), \
+        array("b", (height for row in heightmap for height in row))
+
+################################################################################
+
+def _decode_heightmap(arrays: Tuple[memoryview, ...]) -> Tuple[Sequence[int], ...]:
+    """
+    :param arrays: the row length and the heights
+    :return: heights of the floor locations; the rows are slices of the heights
+    """
+
+    (width,), heights = arrays
+    if width == 0:
+        return ()
+    return tuple(heights[i:i + width] for i in range(0, len(heights), width))
+
+################################################################################
+
+@binary_cached("heightmap", _encode_heightmap, _decode_heightmap)
+def _parse_heightmap(path: str) -> Tuple[Sequence[int], ...]:
+    """
+    :param path: input file path
+    :return: heights of the floor locations
+    """
+
+    return tuple(map(
+        lambda row: tuple([int(value) for value in row]),
+        read_lines(path)))
+
+################################################################################
+
+def parse_input(path: str = None) -> Tuple[Sequence[int], ...]:
+    """
+    :param path: input file path, the day input by default
+    :return: heights of the floor locations
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, _parse_heightmap)
 
 ################################################################################
 
@@ -33,17 +81,14 @@ class Heightmap(object):
 
 ################################################################################
 
-    def __init__(self):
+    def __init__(self, heightmap: Tuple[Sequence[int], ...]):
         """
-
+        :param heightmap: heights of the floor locations
         """
 
         super().__init__()
 
-        with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-            self._heightmap = tuple(map(
-                lambda row: tuple([int(value) for value in row]),
-                [line.strip() for line in f.readlines()]))
+        self._heightmap = heightmap
 
         self._low_points = []
         self._find_low_points()
@@ -52,6 +97,7 @@ class Heightmap(object):
 
 ################################################################################
 
+    @timed(PHASE_CORE)
     def _find_low_points(self) -> None:
         """
         Finds the locations that are lower than any of its adjacent locations.
@@ -89,6 +135,7 @@ class Heightmap(object):
 
 ################################################################################
 
+    @timed(PHASE_CORE)
     def _find_basins(self) -> None:
         """
         A basin is all locations that eventually flow downward to a single low
@@ -221,6 +268,17 @@ class Heightmap(object):
 
 ################################################################################
 
+def solve_1(data: Union[Tuple[Sequence[int], ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: sum of the risk levels of all low points
+    """
+
+    heightmap = Heightmap(parse_input(data) if isinstance(data, str) else data)
+    return heightmap.risk_level_sum
+
+################################################################################
+
 def puzzle_1() -> None:
     """
     --- Part One ---
@@ -256,9 +314,21 @@ def puzzle_1() -> None:
     levels of all low points on your heightmap?
     """
 
-    heightmap = Heightmap()
     # should be 504
-    print(heightmap.risk_level_sum)
+    print(solve_1(parse_input()))
+
+################################################################################
+
+def solve_2(data: Union[Tuple[Sequence[int], ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: sizes of the three largest basins multiplied together
+    """
+
+    heightmap = Heightmap(parse_input(data) if isinstance(data, str) else data)
+    with phase(PHASE_REDUCE):
+        basins = tuple(sorted(heightmap.basins, key=lambda basin: basin[heightmap.KEY_SIZE], reverse=True))
+        return basins[0][heightmap.KEY_SIZE] * basins[1][heightmap.KEY_SIZE] * basins[2][heightmap.KEY_SIZE]
 
 ################################################################################
 
@@ -316,9 +386,7 @@ def puzzle_2() -> None:
     basins?
     """
 
-    heightmap = Heightmap()
-    basins = tuple(sorted(heightmap.basins, key=lambda basin: basin[heightmap.KEY_SIZE], reverse=True))
     # should be 1558722
-    print(basins[0][heightmap.KEY_SIZE] * basins[1][heightmap.KEY_SIZE] * basins[2][heightmap.KEY_SIZE])
+    print(solve_2(parse_input()))
 
 ################################################################################
\ No newline at end of file
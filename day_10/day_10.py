@@ -1,8 +1,9 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
+from typing import Tuple, Union
+
+from common.input_loader import input_path, load_parsed, read_lines
 
 """
 --- Day 10: Syntax Scoring ---
@@ -19,7 +20,6 @@ navigation subsystem (your puzzle input).
 ################################################################################
 
 SELF_DIR_NAME = "day_10"
-INPUT_TXT_NAME = "input.txt"
 KEY_CLOSING_CHARACTER = "CLOSING_CHARACTER"
 KEY_SCORE = "SCORE"
 
@@ -46,6 +46,16 @@ AUTOCOMPLETE_SCORES = {
 
 ################################################################################
 
+def parse_input(path: str = None) -> Tuple[str, ...]:
+    """
+    :param path: input file path, the day input by default
+    :return: lines of the navigation subsystem
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, read_lines)
+
+################################################################################
+
 def syntax_error_score(line: str) -> int:
     """
     A corrupted line is one where a chunk closes with the wrong character - that
@@ -115,6 +125,18 @@ def autocomplete_score(line: str) -> int:
 
 ################################################################################
 
+def solve_1(data: Union[Tuple[str, ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: total syntax error score of the corrupted lines
+    """
+
+    lines = parse_input(data) if isinstance(data, str) else data
+
+    return sum([syntax_error_score(line) for line in lines])
+
+################################################################################
+
 def puzzle_1() -> None:
     """
     --- Part One ---
@@ -188,11 +210,22 @@ def puzzle_1() -> None:
     subsystem. What is the total syntax error score for those errors?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        lines = tuple([line.strip() for line in f.readlines()])
-
     # should be 392367
-    print(sum([syntax_error_score(line) for line in lines]))
+    print(solve_1(parse_input()))
+
+################################################################################
+
+def solve_2(data: Union[Tuple[str, ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: middle autocomplete score of the incomplete lines
+    """
+
+    lines = parse_input(data) if isinstance(data, str) else data
+    incomplete_lines = tuple(filter(lambda line: syntax_error_score(line) == 0, lines))
+    autocomplete_scores = tuple(sorted([autocomplete_score(line) for line in incomplete_lines]))
+
+    return autocomplete_scores[len(autocomplete_scores) // 2]
 
 ################################################################################
 
@@ -259,12 +292,7 @@ def puzzle_2() -> None:
     strings, and sort the scores. What is the middle score?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        lines = tuple([line.strip() for line in f.readlines()])
-        incomplete_lines = tuple(filter(lambda line: syntax_error_score(line) == 0, lines))
-        autocomplete_scores = tuple(sorted([autocomplete_score(line) for line in incomplete_lines]))
-
     # should be 2192104158
-    print(autocomplete_scores[len(autocomplete_scores) // 2])
+    print(solve_2(parse_input()))
 
 ################################################################################
\ No newline at end of file
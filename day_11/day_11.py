@@ -1,8 +1,10 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from os import getcwd
-from os.path import join
+from typing import Tuple, Union
+
+from common.input_loader import input_path, load_parsed, read_lines
+from common.instrumentation import PHASE_CORE, PHASE_REDUCE, phase
 
 """
 --- Day 11: Dumbo Octopus ---
@@ -21,7 +23,6 @@ will happen.
 ################################################################################
 
 SELF_DIR_NAME = "day_11"
-INPUT_TXT_NAME = "input.txt"
 STEPS = 100
 
 
@@ -126,7 +127,51 @@ class Octopus(object):
 
 ################################################################################
 
+def _parse_energy_levels(path: str) -> Tuple[Tuple[int, ...], ...]:
+    """
+    :param path: input file path
+    :return: initial energy levels of the octopuses
+    """
+
+    return tuple(tuple(int(energy_level) for energy_level in line)
+                 for line in read_lines(path))
+
+################################################################################
+
+def parse_input(path: str = None) -> Tuple[Tuple[int, ...], ...]:
+    """
+    :param path: input file path, the day input by default
+    :return: initial energy levels of the octopuses
+    """
+
+    return load_parsed(input_path(SELF_DIR_NAME) if path is None else path, _parse_energy_levels)
+
+################################################################################
+
+def solve_1(data: Union[Tuple[Tuple[int, ...], ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: total number of flashes after 100 steps
+    """
+
+    energy_levels = parse_input(data) if isinstance(data, str) else data
+    octopuses = tuple([tuple([Octopus(energy_levels[row][column], row, column)
+                              for column in range(len(energy_levels[row]))])
+                       for row in range(len(energy_levels))])
+
+    with phase(PHASE_CORE):
+        for _ in range(STEPS):
+            [octopuses[row][column].increase_energy_level(octopuses)
+             for row in range(len(octopuses))
+             for column in range(len(octopuses[row]))]
+            [octopuses[row][column].reset_energy_level()
+             for row in range(len(octopuses))
+             for column in range(len(octopuses[row]))]
 
+    with phase(PHASE_REDUCE):
+        return sum([octopuses[row][column].flashes_count
+                    for row in range(len(octopuses))
+                    for column in range(len(octopuses[row]))])
 
 ################################################################################
 
@@ -466,24 +511,36 @@ def puzzle_1() -> None:
     simulate 100 steps. How many total flashes are there after 100 steps?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        lines = tuple([tuple(line.strip()) for line in f.readlines()])
-        octopuses = tuple([tuple([Octopus(int(lines[row][column]), row, column)
-                                  for column in range(len(lines[row]))])
-                           for row in range(len(lines))])
+    # should be 1697
+    print(solve_1(parse_input()))
 
-        for _ in range(STEPS):
+################################################################################
+
+def solve_2(data: Union[Tuple[Tuple[int, ...], ...], str]) -> int:
+    """
+    :param data: parsed input (see parse_input) or the input file path
+    :return: the first step during which all octopuses flash
+    """
+
+    energy_levels = parse_input(data) if isinstance(data, str) else data
+    octopuses = tuple([tuple([Octopus(energy_levels[row][column], row, column)
+                              for column in range(len(energy_levels[row]))])
+                       for row in range(len(energy_levels))])
+
+    step = 0
+    with phase(PHASE_CORE):
+        while any([octopuses[row][column].energy_level != Octopus.ENERGY_LEVEL_RESET
+                   for row in range(len(octopuses))
+                   for column in range(len(octopuses[row]))]):
             [octopuses[row][column].increase_energy_level(octopuses)
              for row in range(len(octopuses))
              for column in range(len(octopuses[row]))]
             [octopuses[row][column].reset_energy_level()
              for row in range(len(octopuses))
              for column in range(len(octopuses[row]))]
+            step += 1
 
-        # should be 1697
-        print(sum([octopuses[row][column].flashes_count
-                   for row in range(len(octopuses))
-                   for column in range(len(octopuses[row]))]))
+    return step
 
 ################################################################################
 
@@ -542,25 +599,7 @@ def puzzle_2() -> None:
     the first step during which all octopuses flash?
     """
 
-    with open(join(getcwd(), SELF_DIR_NAME, INPUT_TXT_NAME), "r") as f:
-        lines = tuple([tuple(line.strip()) for line in f.readlines()])
-        octopuses = tuple([tuple([Octopus(int(lines[row][column]), row, column)
-                                  for column in range(len(lines[row]))])
-                           for row in range(len(lines))])
-
-        step = 0
-        while any([octopuses[row][column].energy_level != Octopus.ENERGY_LEVEL_RESET
-                   for row in range(len(octopuses))
-                   for column in range(len(octopuses[row]))]):
-            [octopuses[row][column].increase_energy_level(octopuses)
-             for row in range(len(octopuses))
-             for column in range(len(octopuses[row]))]
-            [octopuses[row][column].reset_energy_level()
-             for row in range(len(octopuses))
-             for column in range(len(octopuses[row]))]
-            step += 1
-
-        # should be 344
-        print(step)
+    # should be 344
+    print(solve_2(parse_input()))
 
 ################################################################################
\ No newline at end of file
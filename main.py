@@ -1,7 +1,14 @@
 __author__ = "Tofu Gang"
 __email__ = "tofugangsw@gmail.com"
 
-from day_11.day_11 import puzzle_2 as puzzle
+from argparse import ArgumentParser
+from time import perf_counter
+
+from common.answer_cache import DEFAULT_ANSWER_CACHE_PATH, AnswerCache
+from common.instrumentation import enable as enable_instrumentation
+from common.registry import discover_days
+from common.runner import PARTS, SELECTOR_ALL, parse_selector, run_puzzles, \
+    run_puzzles_parallel, format_result, format_time
 
 """
 You're minding your own business on a ship at sea when the overboard alarm goes 
@@ -24,9 +31,88 @@ first. Each puzzle grants one star. Good luck!
 
 ################################################################################
 
+def create_parser() -> ArgumentParser:
+    """
+    :return: command line parser; days and parts to run
+    """
+
+    parser = ArgumentParser(description="Advent Of Code 2021 puzzles runner")
+    parser.add_argument(
+        "-d", "--day", nargs="+", default=[SELECTOR_ALL],
+        help="days to run, e.g. \"1 3 11\" or \"1,3,11\" (default: %s)" % SELECTOR_ALL)
+    parser.add_argument(
+        "-p", "--part", nargs="+", default=[SELECTOR_ALL],
+        help="puzzles of each day to run, 1 and/or 2 (default: %s)" % SELECTOR_ALL)
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of worker processes to run the puzzles in parallel, 0 for one "
+             "per CPU core (default: 1, all the puzzles run in this process)")
+    parser.add_argument(
+        "-i", "--instrument", action="store_true",
+        help="report the time spent in the phases of the puzzles (parse, core, reduce)")
+    parser.add_argument(
+        "--profile", metavar="DIR",
+        help="profile the puzzles by cProfile, the stats are dumped to this directory")
+    parser.add_argument(
+        "--cache", nargs="?", const=DEFAULT_ANSWER_CACHE_PATH, metavar="FILE",
+        help="reuse the answers of the puzzles already solved on the same input by the "
+             "same solver, they are kept in this file (default: %s)" % DEFAULT_ANSWER_CACHE_PATH)
+    parser.add_argument(
+        "-c", "--check", action="store_true",
+        help="check the answers and time budgets instead of just printing the answers")
+    parser.add_argument(
+        "-x", "--cross-check", type=int, metavar="CASES",
+        help="check the alternate engines of the puzzles against the reference ones on this many "
+             "random inputs instead of just printing the answers")
+    return parser
+
+################################################################################
+
 if __name__ == "__main__":
+    parser = create_parser()
+    arguments = parser.parse_args()
+    try:
+        days = parse_selector(arguments.day, discover_days())
+        parts = parse_selector(arguments.part, PARTS)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if arguments.instrument:
+        # before the days are imported, so their timed functions get wrapped
+        enable_instrumentation()
+
     print("---Advent Of Code 2021---")
-    puzzle()
+    if arguments.cross_check is not None:
+        # imported only when needed, it is not a part of the plain run startup
+        from common.regression import KEY_STATUS, STATUS_OK, run_cross_checks, format_cross_check
+
+        results = run_cross_checks(days, parts, arguments.cross_check)
+        for result in results:
+            print(format_cross_check(result))
+        exit(0 if all(result[KEY_STATUS] == STATUS_OK for result in results) else 1)
+
+    if arguments.check:
+        # imported only when needed, it is not a part of the plain run startup
+        from common.regression import KEY_STATUS, STATUS_OK, run_regression, format_check
+
+        # the alternate engines of the days are checked too
+        results = run_regression(days, parts, alternates=True)
+        for result in results:
+            print(format_check(result))
+        exit(0 if all(result[KEY_STATUS] == STATUS_OK for result in results) else 1)
+
+    start = perf_counter()
+    answers = None if arguments.cache is None else AnswerCache(arguments.cache)
+    if arguments.jobs == 1:
+        results = run_puzzles(days, parts, arguments.profile, answers)
+    else:
+        results = run_puzzles_parallel(days, parts, arguments.jobs if arguments.jobs > 0 else None,
+                                       arguments.profile, answers)
+    for result in results:
+        print(format_result(result))
+    if answers is not None:
+        answers.save()
+    print("total %s" % format_time(perf_counter() - start))
     exit(0)
 
 ################################################################################
\ No newline at end of file